@@ -0,0 +1,101 @@
+from django.contrib.auth import get_user_model
+from django.utils.functional import cached_property
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.tokens import RefreshToken
+
+User = get_user_model()
+
+ROLE_CLAIMS = ('username', 'role', 'is_superuser')
+
+
+class RoleRefreshToken(RefreshToken):
+    """
+    Токен, в который при выдаче записываются роль и имя пользователя.
+
+    Утверждения копируются и в access-токен, поэтому проверки прав
+    не требуют загрузки пользователя из базы.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for claim in ROLE_CLAIMS:
+            token[claim] = getattr(user, claim)
+        return token
+
+
+class RoleTokenUser(TokenUser):
+    """
+    Пользователь, восстановленный из утверждений токена без запроса к БД.
+
+    Повторяет интерфейс модели User, нужный разрешениям: роль,
+    is_admin и is_moderator.
+    """
+
+    @cached_property
+    def role(self):
+        return self.token['role']
+
+    @property
+    def is_admin(self):
+        return self.role == User.UserRoles.ADMIN or self.is_superuser
+
+    @property
+    def is_moderator(self):
+        return self.role == User.UserRoles.MODERATOR
+
+    def get_full_user(self):
+        """Загрузка полной записи пользователя из базы."""
+        try:
+            return User.objects.get(pk=self.pk, is_active=True)
+        except User.DoesNotExist:
+            raise AuthenticationFailed(
+                'Пользователь не найден.', code='user_not_found'
+            )
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    Аутентификация по JWT без запроса пользователя к базе.
+
+    Если в токене есть все утверждения ROLE_CLAIMS, request.user
+    строится из них. Токены без утверждений (выданные до появления
+    этого класса) обрабатываются как раньше — с загрузкой из базы.
+    Устаревание роли ограничено сроком жизни access-токена.
+
+    Запросы на запись всё же загружают пользователя: токен удалённого
+    или неактивного пользователя действует до истечения срока, и без
+    проверки он мог бы создавать и менять записи. Такие запросы
+    получают 401.
+    """
+
+    def authenticate(self, request):
+        result = super().authenticate(request)
+        if result is None or request.method in SAFE_METHODS:
+            return result
+        user, validated_token = result
+        if isinstance(user, RoleTokenUser):
+            user = user.get_full_user()
+        return user, validated_token
+
+    def get_user(self, validated_token):
+        if all(claim in validated_token for claim in ROLE_CLAIMS):
+            return RoleTokenUser(validated_token)
+        return super().get_user(validated_token)
+
+
+def get_full_user(request):
+    """
+    Возвращает модель пользователя запроса, загружая её при необходимости.
+
+    Нужна эндпоинтам, которые читают или меняют поля профиля.
+    Загруженный объект подменяет request.user до конца запроса.
+    """
+    user = request.user
+    if isinstance(user, RoleTokenUser):
+        user = user.get_full_user()
+        request.user = user
+    return user
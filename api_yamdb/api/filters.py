@@ -1,26 +1,114 @@
+from django.db.models import Q
 from django_filters import rest_framework as filters
 
-from reviews.models import Title
+from reviews.models import Category, Title
+from reviews.search import search_titles
+
+SLUG_MATCH_CHOICES = (
+    ('exact', 'Точное совпадение'),
+    ('prefix', 'Начало слага'),
+    ('contains', 'Подстрока'),
+)
+GENRE_MODE_CHOICES = (
+    ('any', 'Любой из жанров'),
+    ('all', 'Все жанры'),
+)
+
+
+def slug_condition(field_name, value, match):
+    """
+    Условие на слаг для выбранного режима сравнения.
+
+    Префикс ищется диапазоном ``[value, следующий за value)``, а не через
+    LIKE: так запрос использует уникальный индекс слага на любой СУБД.
+    """
+    if match == 'prefix':
+        upper_bound = value[:-1] + chr(ord(value[-1]) + 1)
+        return Q(**{
+            f'{field_name}__gte': value,
+            f'{field_name}__lt': upper_bound,
+        })
+    if match == 'contains':
+        return Q(**{f'{field_name}__icontains': value})
+    return Q(**{field_name: value})
 
 
 class TitleFilter(filters.FilterSet):
     """Фильтр произведения."""
 
-    genre = filters.CharFilter(
-        field_name='genre__slug',
-        lookup_expr='icontains',
-    )
-    category = filters.CharFilter(
-        field_name='category__slug',
-        lookup_expr='icontains',
-    )
+    genre = filters.CharFilter(method='filter_genre')
+    category = filters.CharFilter(method='filter_category')
     name = filters.CharFilter(
         field_name='name',
         lookup_expr='icontains',
     )
+    search = filters.CharFilter(method='filter_search')
+    slug_match = filters.ChoiceFilter(
+        choices=SLUG_MATCH_CHOICES, method='filter_options'
+    )
+    genre_mode = filters.ChoiceFilter(
+        choices=GENRE_MODE_CHOICES, method='filter_options'
+    )
 
     class Meta:
         """Мета класс фильтра."""
 
-        fields = ('name', 'year', 'genre', 'category')
+        fields = (
+            'name', 'year', 'genre', 'category', 'search',
+            'slug_match', 'genre_mode'
+        )
         model = Title
+
+    @property
+    def slug_match_mode(self):
+        """
+        Режим сравнения слагов.
+
+        По умолчанию - подстрока без учёта регистра, как до появления
+        параметра slug_match: у существующих клиентов выдача не меняется.
+        Точное и префиксное сравнение, использующие индекс слага,
+        включаются явно.
+        """
+        return self.form.cleaned_data.get('slug_match') or 'contains'
+
+    def filter_options(self, queryset, name, value):
+        """Параметры режима сравнения сами по себе не фильтруют."""
+        return queryset
+
+    def filter_genre(self, queryset, name, value):
+        """
+        Фильтрация по одному или нескольким жанрам через запятую.
+
+        Каждый жанр проверяется подзапросом к промежуточной таблице,
+        поэтому весь фильтр - один SQL-запрос без дублей в выдаче.
+        """
+        slugs = [slug for slug in value.split(',') if slug]
+        if not slugs:
+            return queryset
+        title_genres = Title.genre.through.objects
+        conditions = [
+            slug_condition('genre__slug', slug, self.slug_match_mode)
+            for slug in slugs
+        ]
+        if self.form.cleaned_data.get('genre_mode') == 'all':
+            for condition in conditions:
+                queryset = queryset.filter(id__in=title_genres.filter(
+                    condition
+                ).values('title_id'))
+            return queryset
+        any_condition = Q()
+        for condition in conditions:
+            any_condition |= condition
+        return queryset.filter(id__in=title_genres.filter(
+            any_condition
+        ).values('title_id'))
+
+    def filter_category(self, queryset, name, value):
+        """Фильтрация по слагу категории."""
+        return queryset.filter(category__in=Category.objects.filter(
+            slug_condition('slug', value, self.slug_match_mode)
+        ))
+
+    def filter_search(self, queryset, name, value):
+        """Полнотекстовый поиск по названию и описанию."""
+        return search_titles(queryset, value)
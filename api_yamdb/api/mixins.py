@@ -1,10 +1,147 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.http import Http404
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
 from rest_framework import filters, generics, mixins, status, viewsets
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
 
 from api.permissions import AdminAddDeletePermission
+from api.throttling import AuthIPThrottle, AuthUsernameThrottle
+from reviews.models import CatalogVersion
+
+
+class ConditionalGetMixin:
+    """
+    Миксин условных GET-запросов по версии раздела каталога.
+
+    ETag и Last-Modified строятся из версии ``version_scope``, поэтому
+    ответ 304 отдаётся без запроса списка и без сериализации.
+    Для детальных страниц вьюсет оборачивает retrieve сам; перед ответом
+    304 проверяется, что объект существует, иначе удалённый или
+    несуществующий объект получал бы 304 вместо 404.
+    """
+
+    version_scope = None
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        version, modified = CatalogVersion.get_stamp(self.version_scope)
+        self.catalog_stamp = (version, modified)
+        etag = f'"{self.version_scope}-{version}"'
+        last_modified = (
+            int(modified.timestamp()) if modified is not None else None
+        )
+        not_modified = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if not_modified is not None:
+            if self.detail:
+                self.check_object_exists()
+            return not_modified
+        response = handler(request, *args, **kwargs)
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def check_object_exists(self):
+        """Проверка существования объекта одним запросом EXISTS."""
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            exists = self.get_queryset().filter(
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+            ).exists()
+        except (TypeError, ValueError, ValidationError):
+            exists = False
+        if not exists:
+            raise Http404
+
+
+class VersionedCacheMixin:
+    """
+    Кэш ответов list и retrieve в кэше Django.
+
+    Ключ строится из нормализованных параметров запроса и текущей версии
+    раздела каталога (поколения): запись в раздел меняет версию, и старые
+    записи кэша просто перестают читаться и вытесняются по таймауту.
+    """
+
+    version_scope = None
+    cache_stats_keys = ('hits', 'misses')
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        key = self.get_response_cache_key(request)
+        data = cache.get(key)
+        if data is not None:
+            self.record_cache_access('hits')
+            response = Response(data)
+            response['X-Cache'] = 'HIT'
+            return response
+        response = handler(request, *args, **kwargs)
+        self.record_cache_access('misses')
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(key, response.data, settings.RESPONSE_CACHE_TIMEOUT)
+        response['X-Cache'] = 'MISS'
+        return response
+
+    def get_response_cache_key(self, request):
+        stamp = getattr(self, 'catalog_stamp', None)
+        if stamp is None:
+            stamp = CatalogVersion.get_stamp(self.version_scope)
+        version, modified = stamp
+        generation = (
+            f'{version}.{modified.timestamp()}' if modified else version
+        )
+        params = sorted(
+            (name, sorted(request.query_params.getlist(name)))
+            for name in request.query_params
+        )
+        request_key = json.dumps(
+            [self.action, self.kwargs, params, request.get_host()],
+            sort_keys=True,
+            default=str,
+        )
+        digest = hashlib.md5(request_key.encode()).hexdigest()
+        return f'response:{self.version_scope}:{generation}:{digest}'
+
+    def record_cache_access(self, outcome):
+        key = f'response-stats:{self.version_scope}:{outcome}'
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
+
+    def get_cache_stats(self):
+        """Счётчики попаданий и промахов кэша раздела."""
+        stats = {
+            outcome: cache.get(
+                f'response-stats:{self.version_scope}:{outcome}', 0
+            )
+            for outcome in self.cache_stats_keys
+        }
+        total = stats['hits'] + stats['misses']
+        stats['hit_ratio'] = stats['hits'] / total if total else None
+        return stats
 
 
 class MixinCategoryGenre(
+    ConditionalGetMixin,
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
     mixins.DestroyModelMixin,
@@ -18,7 +155,15 @@ class MixinCategoryGenre(
 
 
 class UserAuthMixin(generics.CreateAPIView):
-    """Миксин для пользователей."""
+    """
+    Миксин для пользователей.
+
+    Эндпоинты открыты для всех, поэтому аутентификация отключена:
+    частота проверяется сразу, без разбора JWT и запросов к базе.
+    """
+
+    authentication_classes = ()
+    throttle_classes = (AuthIPThrottle, AuthUsernameThrottle)
 
     def post(self, request, *args, **kwargs):
         response = super().post(request, *args, **kwargs)
@@ -0,0 +1,107 @@
+import json
+from base64 import b64decode, b64encode
+from binascii import Error as BinasciiError
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(PageNumberPagination):
+    """
+    Постраничная пагинация с keyset-режимом по запросу клиента.
+
+    Без параметра ``cursor`` работает как обычная PageNumberPagination.
+    Если параметр передан (для первой страницы - пустым), выборка
+    продолжается после последней записи предыдущей страницы по ключу
+    ``keyset_fields``: без OFFSET и без COUNT(*), поэтому время ответа
+    не зависит от глубины страницы.
+    """
+
+    cursor_query_param = 'cursor'
+    keyset_fields = ('id',)
+    invalid_cursor_message = 'Некорректный курсор.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.use_keyset = self.cursor_query_param in request.query_params
+        if not self.use_keyset:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.keyset_page_size = self.get_page_size(request)
+        queryset = queryset.order_by(*self.keyset_fields)
+        position = self.decode_cursor(
+            queryset.model, request.query_params[self.cursor_query_param]
+        )
+        if position is not None:
+            queryset = queryset.filter(self.get_keyset_filter(position))
+        results = list(queryset[:self.keyset_page_size + 1])
+        self.has_next = len(results) > self.keyset_page_size
+        results = results[:self.keyset_page_size]
+        self.last_object = results[-1] if results else None
+        return results
+
+    def get_paginated_response(self, data):
+        if not self.use_keyset:
+            return super().get_paginated_response(data)
+        return Response(OrderedDict([
+            ('next', self.get_next_cursor_link()),
+            ('results', data),
+        ]))
+
+    def get_keyset_filter(self, position):
+        """Условие «строго после позиции» для составного ключа."""
+        keyset_filter = Q()
+        for index, field in enumerate(self.keyset_fields):
+            condition = Q(**{f'{field}__gt': position[index]})
+            for previous, value in zip(self.keyset_fields, position):
+                if previous == field:
+                    break
+                condition &= Q(**{previous: value})
+            keyset_filter |= condition
+        return keyset_filter
+
+    def get_next_cursor_link(self):
+        if not self.has_next:
+            return None
+        opts = self.last_object._meta
+        position = [
+            opts.get_field(field).value_to_string(self.last_object)
+            for field in self.keyset_fields
+        ]
+        cursor = b64encode(json.dumps(position).encode()).decode()
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.cursor_query_param,
+            cursor
+        )
+
+    def decode_cursor(self, model, cursor):
+        if not cursor:
+            return None
+        try:
+            position = json.loads(b64decode(cursor.encode()).decode())
+            if len(position) != len(self.keyset_fields):
+                raise ValueError
+            return [
+                model._meta.get_field(field).to_python(value)
+                for field, value in zip(self.keyset_fields, position)
+            ]
+        except (BinasciiError, TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+
+class TitlePagination(KeysetPagination):
+    """Пагинация произведений: keyset по названию."""
+
+    keyset_fields = ('name', 'id')
+
+
+class PubDatePagination(KeysetPagination):
+    """Пагинация отзывов и комментариев: keyset по дате публикации."""
+
+    keyset_fields = ('pub_date', 'id')
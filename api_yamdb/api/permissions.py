@@ -38,7 +38,7 @@ class IsAdminAuthorOrReadOnly(BasePermission):
         if request.method == 'POST':
             return request.user.is_authenticated
         return (request.user.is_authenticated and (
-            request.user == obj.author
+            request.user.pk == obj.author_id
             or request.user.is_moderator
             or request.user.is_admin
         ))
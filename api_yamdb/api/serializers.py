@@ -1,9 +1,13 @@
 from django.contrib.auth.tokens import default_token_generator
-from django.db.models import Q
+from django.db import IntegrityError, transaction
+from django.db.models import Q, Value
+from django.db.models.functions import Lower
 from django.shortcuts import get_object_or_404
 from rest_framework import serializers
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework.settings import api_settings
+from rest_framework.validators import UniqueValidator
 
+from api.authentication import RoleRefreshToken
 from api.utils import send_confirmation_code
 from reviews.consts import (
     ERROR_MESSAGE_SIGNUP, MAX_LEN_EMAIL, MAX_LEN_USERNAME
@@ -14,6 +18,21 @@ from reviews.models import (
 from reviews.validators import username_validator, validate_username_me
 
 
+# Проверки уникальности без учёта регистра, как у индексов
+# по LOWER(...) в базе; иначе дубль в другом регистре падал бы
+# с IntegrityError.
+USER_UNIQUE_CI_KWARGS = {
+    'username': {'validators': (
+        username_validator,
+        validate_username_me,
+        UniqueValidator(User.objects.all(), lookup='iexact'),
+    )},
+    'email': {'validators': (
+        UniqueValidator(User.objects.all(), lookup='iexact'),
+    )},
+}
+
+
 class UserFullInfoSerializer(serializers.ModelSerializer):
     """Сериализатор полной информации пользователя."""
 
@@ -22,6 +41,7 @@ class UserFullInfoSerializer(serializers.ModelSerializer):
         fields = (
             'username', 'email', 'first_name', 'last_name', 'bio', 'role'
         )
+        extra_kwargs = USER_UNIQUE_CI_KWARGS
 
 
 class UserSignupSerializer(serializers.Serializer):
@@ -41,12 +61,23 @@ class UserSignupSerializer(serializers.Serializer):
         return user
 
     def validate(self, attrs):
+        """
+        Проверка занятости имени и почты одним индексным запросом.
+
+        Сравнение идёт без учёта регистра по индексам на LOWER(...),
+        поэтому найдётся не больше двух пользователей: один по почте
+        и один по имени.
+        """
         email = attrs.get('email')
         username = attrs.get('username')
         errors = {}
-        users = User.objects.filter(
-            Q(email=email) | Q(username=username)
-        )
+        users = list(User.objects.alias(
+            email_lower=Lower('email'),
+            username_lower=Lower('username')
+        ).filter(
+            Q(email_lower=Lower(Value(email)))
+            | Q(username_lower=Lower(Value(username)))
+        ).order_by()[:2])
         if users:
             if any(user.username != username for user in users):
                 errors['email'] = ERROR_MESSAGE_SIGNUP.format(
@@ -58,7 +89,7 @@ class UserSignupSerializer(serializers.Serializer):
                 )
             if errors:
                 raise serializers.ValidationError(errors)
-            attrs['user'] = users.first()
+            attrs['user'] = users[0]
         return attrs
 
 
@@ -70,7 +101,7 @@ class UserTokenSerializer(serializers.Serializer):
 
     def create(self, validated_data):
         user = validated_data.get('user')
-        token = RefreshToken.for_user(user)
+        token = RoleRefreshToken.for_user(user)
         return token
 
     def validate(self, attrs):
@@ -100,6 +131,7 @@ class UserInfoForUserSerializer(serializers.ModelSerializer):
             'username', 'email', 'first_name', 'last_name', 'bio', 'role'
         )
         read_only_fields = ('role',)
+        extra_kwargs = USER_UNIQUE_CI_KWARGS
 
 
 class CategorySerializer(serializers.ModelSerializer):
@@ -133,30 +165,74 @@ class TitleCreateDeleteSerializer(serializers.ModelSerializer):
     class Meta:
         """Мета класс произведения."""
 
-        fields = '__all__'
+        exclude = ('rating', 'review_count', 'score_sum')
         model = Title
 
     def to_representation(self, instance):
         return TitleReadonlySerializer(instance).data
 
 
+class TitleBulkItemSerializer(serializers.ModelSerializer):
+    """
+    Сериализатор одного произведения в пакетной загрузке.
+
+    Слаги категории и жанров только проверяются на формат, а в объекты
+    разрешаются для всего пакета сразу.
+    """
+
+    id = serializers.IntegerField(required=False)
+    category = serializers.SlugField()
+    genre = serializers.ListField(child=serializers.SlugField())
+
+    class Meta:
+        fields = ('id', 'name', 'year', 'description', 'category', 'genre')
+        model = Title
+
+
 class TitleReadonlySerializer(serializers.ModelSerializer):
     """
     Сериализатор произведений для List и Retrieve.
     """
 
-    rating = serializers.IntegerField(default=0)
+    rating = serializers.IntegerField(read_only=True)
     category = CategorySerializer()
     genre = GenreSerializer(many=True)
 
     class Meta:
         """Мета класс произведения."""
 
-        fields = '__all__'
+        fields = (
+            'id', 'name', 'year', 'rating', 'description', 'genre', 'category'
+        )
         model = Title
         read_only_fields = ('__all__',)
 
 
+class TitleWithHistogramSerializer(TitleReadonlySerializer):
+    """
+    Сериализатор произведения с распределением оценок.
+    """
+
+    rating_histogram = serializers.SerializerMethodField()
+
+    class Meta(TitleReadonlySerializer.Meta):
+        fields = TitleReadonlySerializer.Meta.fields + ('rating_histogram',)
+
+    def get_rating_histogram(self, title):
+        return title.get_rating_histogram()
+
+
+class TopTitleSerializer(TitleReadonlySerializer):
+    """
+    Сериализатор произведения в рейтинге лучших.
+    """
+
+    weighted_rating = serializers.FloatField(read_only=True)
+
+    class Meta(TitleReadonlySerializer.Meta):
+        fields = TitleReadonlySerializer.Meta.fields + ('weighted_rating',)
+
+
 class ReviewSerializer(serializers.ModelSerializer):
     """Сериализатор отзыва."""
 
@@ -165,23 +241,35 @@ class ReviewSerializer(serializers.ModelSerializer):
         slug_field='username'
     )
 
-    def validate(self, value):
-        author = self.context['request'].user
-        title_id = (self.context['request'].
-                    parser_context['kwargs'].get('title_id'))
-        title = get_object_or_404(
-            Title,
-            id=title_id
-        )
-        if (self.context['request'].method == 'POST'
-                and title.reviews.filter(author=author).exists()):
-            raise serializers.ValidationError(
-                f'Отзыв на произведение {title.name} уже существует!'
-            )
-        return value
+    def create(self, validated_data):
+        """
+        Создаёт отзыв, полагаясь на ограничение unique_review в БД.
+
+        Повторный отзыв не проверяется отдельным запросом: вставку
+        отклоняет сама база, что исключает гонку параллельных запросов.
+        Только после ошибки проверяется, что её причина - существующий
+        отзыв; другие нарушения целостности пробрасываются дальше.
+        """
+        try:
+            with transaction.atomic():
+                return super().create(validated_data)
+        except IntegrityError:
+            if not Review.objects.filter(
+                title=validated_data['title'],
+                author_id=validated_data['author_id'],
+            ).exists():
+                raise
+            raise serializers.ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    f'Отзыв на произведение {validated_data["title"].name} '
+                    'уже существует!'
+                ]
+            })
 
     class Meta:
-        fields = ('id', 'text', 'author', 'score', 'pub_date')
+        fields = (
+            'id', 'text', 'author', 'score', 'pub_date', 'comment_count'
+        )
         model = Review
 
 
@@ -0,0 +1,150 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class LocalBucketStore:
+    """
+    Хранилище корзин в памяти процесса.
+
+    Ключи приходят от клиента (имя пользователя), поэтому хранилище
+    ограничено: запись устаревает через timeout - к этому времени
+    корзина и так полна, - а сверх max_keys вытесняются давно не
+    использованные корзины. Вытесненная корзина просто начинается
+    заново.
+    """
+
+    def __init__(self, max_keys):
+        self.max_keys = max_keys
+        self.buckets = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.buckets.get(key)
+            if entry is None:
+                return None
+            state, expires = entry
+            if expires <= time.monotonic():
+                del self.buckets[key]
+                return None
+            return state
+
+    def set(self, key, state, timeout):
+        with self.lock:
+            self.buckets[key] = (state, time.monotonic() + timeout)
+            self.buckets.move_to_end(key)
+            while len(self.buckets) > self.max_keys:
+                self.buckets.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.buckets.clear()
+
+
+class CacheBucketStore:
+    """
+    Хранилище корзин в кэше Django, общее для нескольких процессов.
+
+    Подходит любой бэкенд из CACHES, в том числе файловый. Ключ
+    хэшируется: имя пользователя приходит до валидации и может
+    содержать недопустимые для memcached символы.
+    """
+
+    def __init__(self, alias):
+        self.cache = caches[alias]
+
+    def make_key(self, key):
+        return 'throttle:' + hashlib.md5(key.encode()).hexdigest()
+
+    def get(self, key):
+        return self.cache.get(self.make_key(key))
+
+    def set(self, key, state, timeout):
+        self.cache.set(self.make_key(key), state, timeout)
+
+    def clear(self):
+        """Очищает весь кэш алиаса: хэшированные ключи не перечислить."""
+        self.cache.clear()
+
+
+def get_bucket_store():
+    alias = getattr(settings, 'AUTH_THROTTLE_CACHE', None)
+    if alias is None:
+        return LocalBucketStore(
+            getattr(settings, 'AUTH_THROTTLE_LOCAL_MAX_KEYS', 10000)
+        )
+    return CacheBucketStore(alias)
+
+
+bucket_store = get_bucket_store()
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """
+    Ограничение частоты запросов по алгоритму token bucket.
+
+    Ставка из THROTTLE_RATES вида ``5/min`` задаёт ёмкость корзины
+    и время её полного пополнения. Проверка не обращается к базе,
+    поэтому лишние запросы отклоняются до работы сериализатора.
+    """
+
+    store = bucket_store
+
+    def get_cache_key(self, request, view):
+        ident = self.get_bucket_ident(request)
+        if not ident:
+            return None
+        return f'{self.scope}:{view.__class__.__name__}:{ident}'
+
+    def get_bucket_ident(self, request):
+        """Ключ корзины; по умолчанию - IP-адрес клиента."""
+        return self.get_ident(request)
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+        refill = self.num_requests / self.duration
+        now = self.timer()
+        state = self.store.get(self.key)
+        tokens = self.num_requests
+        if state is not None:
+            tokens, updated = state
+            tokens = min(self.num_requests, tokens + (now - updated) * refill)
+        if tokens < 1:
+            self.wait_seconds = (1 - tokens) / refill
+            return False
+        self.store.set(self.key, (tokens - 1, now), self.duration)
+        return True
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class AuthIPThrottle(TokenBucketThrottle):
+    """Ограничение запросов к эндпоинтам авторизации по IP-адресу."""
+
+    scope = 'auth_ip'
+
+
+class AuthUsernameThrottle(TokenBucketThrottle):
+    """Ограничение запросов к эндпоинтам авторизации по имени пользователя."""
+
+    scope = 'auth_username'
+
+    def get_bucket_ident(self, request):
+        if not isinstance(request.data, Mapping):
+            return None
+        username = request.data.get('username')
+        if not isinstance(username, str):
+            return None
+        return username.strip().lower()
@@ -1,16 +1,137 @@
+from collections import Counter
+
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
+from django.db import transaction
+from django.shortcuts import get_object_or_404
 
 from reviews.consts import ADMIN_EMAIL
+from reviews.leaderboard import refresh_leaderboard
+from reviews.models import (
+    CatalogVersion, Category, Genre, OutgoingEmail, Title
+)
 
 
 def send_confirmation_code(user):
-    """Отправляет код подтверждения пользователю."""
-    send_mail(
+    """
+    Ставит письмо с кодом подтверждения в очередь на отправку.
+
+    Само письмо отправляет команда send_outbox_emails, поэтому запрос
+    не ждёт почтовый сервер.
+    """
+    OutgoingEmail.objects.create(
         subject='Подтверждение регистрации',
         message=(f'Код подтверждения - '
                  f'{default_token_generator.make_token(user)}'),
         from_email=ADMIN_EMAIL,
-        recipient_list=[user.email],
-        fail_silently=True,
+        recipient=user.email,
     )
+
+
+def resolve_parent(request, model, **lookup):
+    """
+    Возвращает родительский объект вложенного маршрута.
+
+    Объект загружается через get_object_or_404 один раз за запрос и
+    запоминается на объекте запроса, поэтому вьюсет, проверка прав и
+    сериализатор получают один и тот же экземпляр.
+    """
+    resolved = request.__dict__.setdefault('resolved_parents', {})
+    key = (model, tuple(sorted(lookup.items())))
+    if key not in resolved:
+        resolved[key] = get_object_or_404(model, **lookup)
+    return resolved[key]
+
+
+def bulk_create_with_ids(model, objs):
+    """
+    bulk_create, после которого у объектов заполнены первичные ключи.
+
+    SQLite в Django 3.2 не возвращает id из пакетной вставки. Внутри
+    транзакции после вставки база заблокирована для других писателей,
+    а AUTOINCREMENT выдаёт id по возрастанию, поэтому последние
+    len(objs) ключей таблицы принадлежат вставленным объектам.
+    """
+    model.objects.bulk_create(objs)
+    if objs and objs[0].pk is None:
+        pks = model.objects.order_by('-pk').values_list(
+            'pk', flat=True
+        )[:len(objs)]
+        for obj, pk in zip(objs, reversed(pks)):
+            obj.pk = pk
+    return objs
+
+
+def save_titles_bulk(items):
+    """
+    Создаёт и обновляет пакет произведений.
+
+    items - список пар (позиция в запросе, проверенные данные).
+    Категории, жанры и обновляемые произведения загружаются одним запросом
+    на модель; элементы с неизвестными слагами или id, а также все
+    элементы с повторяющимся id попадают в ошибки, остальные сохраняются
+    одной транзакцией. Описание обновляемого произведения без ключа
+    description не меняется.
+    """
+    categories = Category.objects.in_bulk(
+        {data['category'] for _, data in items}, field_name='slug'
+    )
+    genres = Genre.objects.in_bulk(
+        {slug for _, data in items for slug in data['genre']},
+        field_name='slug'
+    )
+    existing = Title.objects.in_bulk(
+        {data['id'] for _, data in items if 'id' in data}
+    )
+    id_counts = Counter(data['id'] for _, data in items if 'id' in data)
+    errors = {}
+    to_create, to_update, title_genres = [], [], []
+    for index, data in items:
+        item_errors = {}
+        if data['category'] not in categories:
+            item_errors['category'] = [
+                f'Категория {data["category"]} не найдена.'
+            ]
+        unknown_genres = [slug for slug in data['genre'] if slug not in genres]
+        if unknown_genres:
+            item_errors['genre'] = [
+                f'Жанр {slug} не найден.' for slug in unknown_genres
+            ]
+        if 'id' in data and data['id'] not in existing:
+            item_errors['id'] = [f'Произведение {data["id"]} не найдено.']
+        elif id_counts[data.get('id')] > 1:
+            item_errors['id'] = [
+                f'Произведение {data["id"]} повторяется в пакете.'
+            ]
+        if item_errors:
+            errors[index] = item_errors
+            continue
+        title = existing.get(data.get('id')) or Title()
+        title.name = data['name']
+        title.year = data['year']
+        title.description = data.get('description', title.description)
+        title.category = categories[data['category']]
+        (to_update if title.pk else to_create).append((index, title))
+        title_genres.append(
+            (title, [genres[slug] for slug in data['genre']])
+        )
+
+    with transaction.atomic():
+        bulk_create_with_ids(Title, [title for _, title in to_create])
+        Title.objects.bulk_update(
+            [title for _, title in to_update],
+            ('name', 'year', 'description', 'category')
+        )
+        TitleGenre = Title.genre.through
+        TitleGenre.objects.filter(
+            title_id__in=[title.pk for _, title in to_update]
+        ).delete()
+        TitleGenre.objects.bulk_create(
+            TitleGenre(title_id=title.pk, genre_id=genre.pk)
+            for title, genres_of_title in title_genres
+            for genre in set(genres_of_title)
+        )
+        if to_update:
+            refresh_leaderboard(*(title.pk for _, title in to_update))
+        if to_create or to_update:
+            CatalogVersion.bump(CatalogVersion.Scopes.TITLES)
+    return to_create, to_update, errors
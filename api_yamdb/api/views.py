@@ -1,26 +1,39 @@
-from django.db.models import Avg
+import json
+
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import filters, viewsets
+from rest_framework import filters, serializers, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import (
     IsAuthenticated, IsAuthenticatedOrReadOnly)
 from rest_framework.response import Response
 
+from api.authentication import get_full_user
 from api.filters import TitleFilter
-from api.mixins import MixinCategoryGenre, UserAuthMixin
+from api.mixins import (
+    ConditionalGetMixin, MixinCategoryGenre, UserAuthMixin,
+    VersionedCacheMixin
+)
+from api.pagination import PubDatePagination, TitlePagination
 from api.permissions import (
     AdminAddDeletePermission, IsAdmin, IsAdminAuthorOrReadOnly
 )
 from api.serializers import (
     CategorySerializer, CommentSerializer, GenreSerializer,
     ReviewSerializer, TitleReadonlySerializer, TitleCreateDeleteSerializer,
+    TitleBulkItemSerializer, TitleWithHistogramSerializer, TopTitleSerializer,
     UserFullInfoSerializer, UserInfoForUserSerializer,
     UserSignupSerializer, UserTokenSerializer
 )
+from api.utils import resolve_parent, save_titles_bulk
+from reviews.consts import (
+    EXPORT_CHUNK_SIZE, LEADERBOARD_DEFAULT_LIMIT, LEADERBOARD_MAX_LIMIT,
+    MAX_BULK_TITLES
+)
 from reviews.models import (
-    Category, Genre, Review, Title, User
+    CatalogVersion, Category, Genre, LeaderboardEntry, Review, Title, User
 )
 
 
@@ -56,11 +69,12 @@ class UserViewSet(viewsets.ModelViewSet):
     )
     def me(self, request):
         """Получение/редактирование информации о себе."""
+        user = get_full_user(request)
         if request.method == 'GET':
-            serializer = UserInfoForUserSerializer(self.request.user)
+            serializer = UserInfoForUserSerializer(user)
             return Response(serializer.data)
         serializer = UserInfoForUserSerializer(
-            self.request.user,
+            user,
             data=request.data,
             partial=True
         )
@@ -74,6 +88,7 @@ class CategoryViewSet(MixinCategoryGenre):
 
     serializer_class = CategorySerializer
     queryset = Category.objects.all()
+    version_scope = CatalogVersion.Scopes.CATEGORIES
 
 
 class GenreViewSet(MixinCategoryGenre):
@@ -81,24 +96,148 @@ class GenreViewSet(MixinCategoryGenre):
 
     serializer_class = GenreSerializer
     queryset = Genre.objects.all()
+    version_scope = CatalogVersion.Scopes.GENRES
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(
+    ConditionalGetMixin,
+    VersionedCacheMixin,
+    viewsets.ModelViewSet
+):
     """Вьюсет произведения."""
 
     permission_classes = (AdminAddDeletePermission,)
     http_method_names = ('get', 'post', 'patch', 'delete',)
     queryset = (
-        Title.objects.all().
-        annotate(rating=Avg('reviews__score')).order_by('name')
+        Title.objects.select_related('category').
+        prefetch_related('genre').order_by('name')
     )
     filter_backends = (DjangoFilterBackend,)
     filterset_class = TitleFilter
+    pagination_class = TitlePagination
+    version_scope = CatalogVersion.Scopes.TITLES
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    @action(
+        detail=False,
+        url_path='cache-stats',
+        permission_classes=(IsAdmin,)
+    )
+    def cache_stats(self, request):
+        """Статистика попаданий в кэш ответов произведений."""
+        return Response(self.get_cache_stats())
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """
+        Пакетное создание и обновление произведений.
+
+        Элементы с id обновляются, без id - создаются. Ошибки возвращаются
+        по позициям элементов и не мешают сохранить остальные.
+        """
+        if not isinstance(request.data, list):
+            return Response(
+                {'detail': 'Ожидается список произведений.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(request.data) > MAX_BULK_TITLES:
+            return Response(
+                {'detail': f'Не более {MAX_BULK_TITLES} произведений '
+                           'за один запрос.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        valid_items, errors = [], {}
+        for index, item in enumerate(request.data):
+            serializer = TitleBulkItemSerializer(data=item)
+            if serializer.is_valid():
+                valid_items.append((index, serializer.validated_data))
+            else:
+                errors[index] = serializer.errors
+        created, updated, save_errors = save_titles_bulk(valid_items)
+        errors.update(save_errors)
+        results = [
+            {'index': index, 'id': title.pk, 'status': item_status}
+            for item_status, titles in (
+                ('created', created), ('updated', updated)
+            )
+            for index, title in titles
+        ]
+        results.extend(
+            {'index': index, 'status': 'error', 'errors': item_errors}
+            for index, item_errors in errors.items()
+        )
+        return Response({
+            'created': len(created),
+            'updated': len(updated),
+            'errors': len(errors),
+            'results': sorted(results, key=lambda result: result['index']),
+        })
+
+    @action(detail=False)
+    def top(self, request):
+        """
+        Лучшие произведения по взвешенному рейтингу.
+
+        Фильтруется по слагам category и genre, размер задаётся limit.
+        """
+        try:
+            limit = min(
+                int(request.query_params.get(
+                    'limit', LEADERBOARD_DEFAULT_LIMIT
+                )),
+                LEADERBOARD_MAX_LIMIT
+            )
+        except ValueError:
+            limit = LEADERBOARD_DEFAULT_LIMIT
+        if 'genre' in request.query_params:
+            entries = LeaderboardEntry.objects.filter(
+                genre__slug=request.query_params['genre']
+            )
+        else:
+            entries = LeaderboardEntry.objects.filter(genre__isnull=True)
+        if 'category' in request.query_params:
+            entries = entries.filter(
+                category__slug=request.query_params['category']
+            )
+        entries = entries.select_related('title__category').prefetch_related(
+            'title__genre'
+        )[:max(limit, 0)]
+        titles = []
+        for entry in entries:
+            entry.title.weighted_rating = entry.weighted_rating
+            titles.append(entry.title)
+        return Response(TopTitleSerializer(titles, many=True).data)
+
+    @action(detail=True, url_path='rating-histogram')
+    def rating_histogram(self, request, pk=None):
+        """Распределение оценок произведения."""
+        title = get_object_or_404(
+            Title.objects.only('id').prefetch_related('score_counts'), pk=pk
+        )
+        return Response(title.get_rating_histogram())
+
+    def include_histogram(self):
+        return (
+            self.action == 'retrieve'
+            and self.request.query_params.get('histogram') in ('1', 'true')
+        )
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.include_histogram():
+            queryset = queryset.prefetch_related('score_counts')
+        return queryset
 
     def get_serializer_class(self):
         """Получение произведений."""
         if self.action in ('create', 'update', 'partial_update'):
             return TitleCreateDeleteSerializer
+        if self.include_histogram():
+            return TitleWithHistogramSerializer
         return TitleReadonlySerializer
 
 
@@ -109,23 +248,59 @@ class ReviewViewSet(viewsets.ModelViewSet):
     permission_classes = (IsAuthenticatedOrReadOnly,
                           IsAdminAuthorOrReadOnly)
     http_method_names = ('get', 'post', 'patch', 'delete',)
+    pagination_class = PubDatePagination
 
     def get_title(self):
         """Получение произведения."""
-        return get_object_or_404(
+        return resolve_parent(
+            self.request,
             Title,
             id=self.kwargs.get('title_id')
         )
 
     def get_queryset(self):
-        return self.get_title().reviews.all()
+        return self.get_title().reviews.select_related('author').only(
+            'id', 'title', 'text', 'author__username', 'score', 'pub_date',
+            'comment_count'
+        )
 
     def perform_create(self, serializer):
         serializer.save(
-            author=self.request.user,
+            author_id=self.request.user.pk,
             title=self.get_title()
         )
 
+    @action(detail=False)
+    def export(self, request, title_id=None):
+        """
+        Выгрузка всех отзывов произведения в формате NDJSON.
+
+        Строки читаются итератором порциями по EXPORT_CHUNK_SIZE и сразу
+        отдаются клиенту, поэтому память не зависит от числа отзывов.
+        """
+        fields = ('id', 'text', 'author__username', 'score', 'pub_date',
+                  'comment_count')
+        rows = self.get_title().reviews.order_by('pub_date', 'id').values_list(
+            *fields
+        ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        pub_date_field = serializers.DateTimeField()
+
+        def lines():
+            for (review_id, text, author, score, pub_date,
+                 comment_count) in rows:
+                yield json.dumps({
+                    'id': review_id,
+                    'text': text,
+                    'author': author,
+                    'score': score,
+                    'pub_date': pub_date_field.to_representation(pub_date),
+                    'comment_count': comment_count,
+                }, ensure_ascii=False) + '\n'
+
+        return StreamingHttpResponse(
+            lines(), content_type='application/x-ndjson; charset=utf-8'
+        )
+
 
 class CommentViewSet(viewsets.ModelViewSet):
     """Вьюсет комментария."""
@@ -134,20 +309,24 @@ class CommentViewSet(viewsets.ModelViewSet):
     permission_classes = (IsAuthenticatedOrReadOnly,
                           IsAdminAuthorOrReadOnly)
     http_method_names = ('get', 'post', 'patch', 'delete',)
+    pagination_class = PubDatePagination
 
     def get_review(self):
         """получение отзыва."""
-        return get_object_or_404(
+        return resolve_parent(
+            self.request,
             Review,
             id=self.kwargs.get('review_id'),
             title_id=self.kwargs.get('title_id')
         )
 
     def get_queryset(self):
-        return self.get_review().comments.all()
+        return self.get_review().comments.select_related('author').only(
+            'id', 'review', 'text', 'author__username', 'pub_date'
+        )
 
     def perform_create(self, serializer):
         serializer.save(
-            author=self.request.user,
+            author_id=self.request.user.pk,
             review=self.get_review()
         )
@@ -70,6 +70,18 @@ DATABASES = {
 }
 
 
+# Cache
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'api_yamdb',
+    }
+}
+
+RESPONSE_CACHE_TIMEOUT = 60 * 15
+
+
 # Password validation
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -115,12 +127,28 @@ EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.StatelessJWTAuthentication',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
-    'PAGE_SIZE': 10
+    'PAGE_SIZE': 10,
+    'DEFAULT_THROTTLE_RATES': {
+        'auth_ip': '20/min',
+        'auth_username': '5/min',
+    },
+    # Число доверенных прокси перед приложением: IP клиента для
+    # ограничения частоты берётся из X-Forwarded-For только за ними.
+    # При 0 используется REMOTE_ADDR, и заголовок клиента игнорируется.
+    'NUM_PROXIES': 0,
 }
 
+# Алиас из CACHES для общих корзин ограничения частоты;
+# None - корзины в памяти каждого процесса. Лучше отдельный алиас:
+# очистка корзин очищает весь кэш алиаса.
+AUTH_THROTTLE_CACHE = None
+
+# Наибольшее число корзин в памяти процесса (без AUTH_THROTTLE_CACHE).
+AUTH_THROTTLE_LOCAL_MAX_KEYS = 10000
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
     'AUTH_HEADER_TYPES': ('Bearer',),
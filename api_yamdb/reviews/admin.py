@@ -1,7 +1,10 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 
-from reviews.models import Category, Comment, Genre, Review, Title, User
+from reviews.models import (
+    Category, Comment, CsvImportCheckpoint, Genre, OutgoingEmail, Review,
+    Title, User
+)
 
 
 class UserAdmin(BaseUserAdmin):
@@ -33,9 +36,22 @@ class TitleAdmin(admin.ModelAdmin):
     list_display = ('name', 'year', 'category', 'description')
 
 
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'recipient', 'subject', 'created', 'sent_at',
+                    'attempts')
+    list_filter = ('sent_at',)
+
+
+class CsvImportCheckpointAdmin(admin.ModelAdmin):
+    list_display = ('file_name', 'rows_loaded', 'line', 'offset',
+                    'completed', 'updated')
+
+
 admin.site.register(User, UserAdmin)
 admin.site.register(Comment, CommentAdmin)
 admin.site.register(Review, ReviewAdmin)
 admin.site.register(Category, CategoryGenreAdmin)
 admin.site.register(Genre, CategoryGenreAdmin)
 admin.site.register(Title, TitleAdmin)
+admin.site.register(OutgoingEmail, OutgoingEmailAdmin)
+admin.site.register(CsvImportCheckpoint, CsvImportCheckpointAdmin)
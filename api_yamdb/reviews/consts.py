@@ -6,6 +6,30 @@ MAX_LEN_ROLE = 20
 
 MAX_LEN_USERNAME = 150
 
+MAX_LEN_SCOPE = 20
+
+MIN_SCORE = 1
+
+MAX_SCORE = 10
+
+MAX_BULK_TITLES = 1000
+
+LEADERBOARD_PRIOR_SCORE = 5.5
+
+LEADERBOARD_PRIOR_WEIGHT = 5
+
+LEADERBOARD_DEFAULT_LIMIT = 10
+
+LEADERBOARD_MAX_LIMIT = 100
+
+DERIVED_REFRESH_BATCH_SIZE = 500
+
+EXPORT_CHUNK_SIZE = 2000
+
+CSV_BATCH_SIZE = 5000
+
+CSV_PROGRESS_INTERVAL = 5
+
 ADMIN_EMAIL = 'api_yamdb@example.com'
 
 ERROR_MESSAGE_SIGNUP = ('Поле {} не соответствует '
@@ -0,0 +1,76 @@
+import csv
+import gzip
+import json
+from datetime import date
+
+from django.apps import apps
+
+
+def csv_columns(model):
+    """
+    Столбцы выгрузки модели: все поля, кроме вычисляемых счётчиков.
+
+    Счётчики пересчитывает add_db_csv после загрузки, поэтому в файл
+    попадают только исходные данные.
+    """
+    counter_fields = getattr(model, 'counter_fields', ())
+    return [
+        field.attname for field in model._meta.concrete_fields
+        if field.name not in counter_fields
+    ]
+
+
+def csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+def open_output(path, compress):
+    if compress:
+        return gzip.open(path, 'wt', encoding='utf-8', newline='')
+    return open(path, 'w', encoding='utf-8', newline='')
+
+
+def write_csv(file, columns, rows):
+    writer = csv.writer(file)
+    writer.writerow(columns)
+    count = 0
+    for row in rows:
+        writer.writerow([csv_value(value) for value in row])
+        count += 1
+    return count
+
+
+def write_ndjson(file, columns, rows):
+    count = 0
+    for row in rows:
+        file.write(json.dumps(
+            dict(zip(columns, map(csv_value, row))), ensure_ascii=False
+        ) + '\n')
+        count += 1
+    return count
+
+
+WRITERS = {
+    'csv': write_csv,
+    'ndjson': write_ndjson,
+}
+
+
+def dump_model(model_label, path, output_format, compress, chunk_size):
+    """
+    Выгружает таблицу модели в файл, читая её итератором порциями.
+
+    Выполняется и в процессе-обработчике, поэтому принимает метку
+    модели, а не класс. Возвращает число выгруженных строк.
+    """
+    model = apps.get_model(model_label)
+    columns = csv_columns(model)
+    rows = model._base_manager.order_by('pk').values_list(
+        *columns
+    ).iterator(chunk_size=chunk_size)
+    with open_output(path, compress) as file:
+        return WRITERS[output_format](file, columns, rows)
@@ -0,0 +1,154 @@
+import csv
+import hashlib
+
+import django
+from django.apps import apps
+from django.core.exceptions import ValidationError
+
+
+def init_worker():
+    """Настраивает Django в процессе-обработчике, запущенном через spawn."""
+    if not apps.ready:
+        django.setup()
+
+
+def file_hash(path, block_size=1 << 20):
+    """SHA-256 содержимого файла, читаемого блоками."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ChunkReader:
+    """
+    Делит CSV-файл на порции записей с номерами их первых строк.
+
+    Файл читается в двоичном режиме построчно, поэтому после каждой
+    записи известны смещение в байтах и номер строки её конца: с них
+    можно продолжить чтение после перезапуска. Запись может занимать
+    несколько строк файла (текст отзыва с переносами).
+    """
+
+    def __init__(self, file, size):
+        self.file = file
+        self.size = size
+        self.offset = self.line = 0
+        self.reader = csv.reader(self.decoded_lines())
+        self.columns = next(self.reader)
+
+    def decoded_lines(self):
+        for raw in self.file:
+            self.offset += len(raw)
+            self.line += 1
+            yield raw.decode('utf-8')
+
+    def seek(self, offset, line):
+        """Переходит к записи, начинающейся с байта offset."""
+        if offset > self.offset:
+            self.file.seek(offset)
+            self.offset, self.line = offset, line
+
+    def chunks(self):
+        """Порции [(номер строки, значения)] со смещением и строкой конца."""
+        chunk = []
+        line = self.line
+        for values in self.reader:
+            chunk.append((line + 1, values))
+            line = self.line
+            if len(chunk) == self.size:
+                yield chunk, self.offset, self.line
+                chunk = []
+        if chunk:
+            yield chunk, self.offset, self.line
+
+
+def clean_value(field, raw):
+    """
+    Приводит строку из CSV к типу поля и проверяет валидаторы поля.
+
+    Пустая строка допустима для любого текстового поля, как и в базе:
+    например, у пользователей из исходных файлов пустой пароль.
+    """
+    if raw == '' and field.null:
+        return None
+    if field.is_relation:
+        # Существование связанной записи проверяется по множеству id.
+        return field.target_field.to_python(raw)
+    try:
+        value = field.to_python(raw)
+        if raw != '':
+            field.validate(value, None)
+        field.run_validators(value)
+    except ValidationError as error:
+        raise ValidationError(
+            [f'{field.attname}: {message}' for message in error.messages]
+        )
+    return value
+
+
+def validate_chunk(model_label, columns, chunk):
+    """
+    Разбирает и проверяет порцию строк в процессе-обработчике.
+
+    Возвращает пару списков: корректные строки (номер, значения)
+    и отклонённые (номер, исходные значения, причина).
+    """
+    model = apps.get_model(model_label)
+    fields = [model._meta.get_field(column) for column in columns]
+    valid, rejected = [], []
+    for line, values in chunk:
+        if len(values) != len(columns):
+            rejected.append((
+                line, values,
+                f'ожидалось столбцов: {len(columns)}, получено: {len(values)}'
+            ))
+            continue
+        try:
+            valid.append((line, {
+                field.attname: clean_value(field, raw)
+                for field, raw in zip(fields, values)
+            }))
+        except ValidationError as error:
+            rejected.append((line, values, '; '.join(error.messages)))
+    return valid, rejected
+
+
+class ForeignKeyChecker:
+    """
+    Проверка внешних ключей по множествам id в памяти.
+
+    Множество id каждой связанной модели читается из базы один раз
+    и пополняется записанными строками, поэтому проверка строк
+    не требует запросов.
+    """
+
+    def __init__(self):
+        self.ids = {}
+
+    def get_ids(self, model):
+        if model not in self.ids:
+            self.ids[model] = set(
+                model._base_manager.values_list('pk', flat=True).iterator()
+            )
+        return self.ids[model]
+
+    def check(self, model, values):
+        """Возвращает описание ошибки или None для корректной строки."""
+        for field in model._meta.concrete_fields:
+            if not field.many_to_one:
+                continue
+            value = values.get(field.attname)
+            if value is None:
+                continue
+            if value not in self.get_ids(field.related_model):
+                return (
+                    f'{field.attname}={value}: нет записи '
+                    f'{field.related_model._meta.verbose_name}'
+                )
+        return None
+
+    def add(self, model, pks):
+        if model in self.ids:
+            self.ids[model].update(pks)
@@ -0,0 +1,104 @@
+from django.db import transaction
+from django.db.models import Avg, Count, IntegerField, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from reviews.consts import DERIVED_REFRESH_BATCH_SIZE
+from reviews.leaderboard import rebuild_leaderboard, refresh_leaderboard
+from reviews.models import (
+    CatalogVersion, Comment, Review, Title, TitleScoreCount
+)
+
+
+def aggregate_subquery(queryset, group_field, aggregate):
+    """Коррелированный подзапрос с одним агрегатом по group_field."""
+    return Subquery(
+        queryset.filter(**{group_field: OuterRef('pk')}).order_by().values(
+            group_field
+        ).annotate(value=aggregate).values('value')
+    )
+
+
+def rebuild_title_counters(title_ids=None):
+    """Пересчитывает рейтинг и счётчики отзывов произведений (или всех)."""
+    titles = Title.objects.all()
+    if title_ids is not None:
+        titles = titles.filter(pk__in=title_ids)
+    titles.update(
+        review_count=Coalesce(
+            aggregate_subquery(Review.objects, 'title', Count('id')),
+            0, output_field=IntegerField()
+        ),
+        score_sum=Coalesce(
+            aggregate_subquery(Review.objects, 'title', Sum('score')),
+            0, output_field=IntegerField()
+        ),
+        rating=aggregate_subquery(Review.objects, 'title', Avg('score')),
+    )
+
+
+def rebuild_score_histogram(title_ids=None):
+    """Пересобирает гистограммы оценок произведений (или всех)."""
+    score_counts = TitleScoreCount.objects.all()
+    reviews = Review.objects.order_by()
+    if title_ids is not None:
+        score_counts = score_counts.filter(title_id__in=title_ids)
+        reviews = reviews.filter(title_id__in=title_ids)
+    score_counts.delete()
+    TitleScoreCount.objects.bulk_create(
+        TitleScoreCount(**score_count)
+        for score_count in reviews.values(
+            'title_id', 'score'
+        ).annotate(count=Count('id'))
+    )
+
+
+def rebuild_comment_counts(review_ids=None):
+    """Пересчитывает количество комментариев отзывов (или всех)."""
+    reviews = Review.objects.all()
+    if review_ids is not None:
+        reviews = reviews.filter(pk__in=review_ids)
+    reviews.update(comment_count=Coalesce(
+        aggregate_subquery(Comment.objects, 'review', Count('id')),
+        0, output_field=IntegerField()
+    ))
+
+
+def rebuild_derived_data():
+    """
+    Пересчитывает всё, что сигналы поддерживают построчно.
+
+    Нужна после массовых операций в обход сигналов (bulk_create,
+    bulk_update): одним проходом на каждую таблицу вместо
+    обработки каждой строки.
+    """
+    with transaction.atomic():
+        rebuild_title_counters()
+        rebuild_score_histogram()
+        rebuild_comment_counts()
+        rebuild_leaderboard()
+        CatalogVersion.bump(*CatalogVersion.Scopes.values)
+
+
+def batched_ids(ids):
+    ids = sorted(ids)
+    for start in range(0, len(ids), DERIVED_REFRESH_BATCH_SIZE):
+        yield ids[start:start + DERIVED_REFRESH_BATCH_SIZE]
+
+
+def refresh_titles(title_ids):
+    """
+    Пересчитывает по отзывам счётчики, оценки и рейтинг произведений.
+
+    Запросов столько, сколько пачек по DERIVED_REFRESH_BATCH_SIZE id,
+    а не сколько изменилось отзывов.
+    """
+    for chunk in batched_ids(title_ids):
+        rebuild_title_counters(chunk)
+        rebuild_score_histogram(chunk)
+        refresh_leaderboard(*chunk)
+
+
+def refresh_comment_counts(review_ids):
+    """Пересчитывает количество комментариев отзывов пачками."""
+    for chunk in batched_ids(review_ids):
+        rebuild_comment_counts(chunk)
@@ -0,0 +1,330 @@
+import random
+import time
+from datetime import datetime, timezone
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+SCORE_WEIGHTS = (1, 1, 2, 3, 5, 8, 12, 14, 10, 6)
+
+ROLE_WEIGHTS = {'user': 980, 'moderator': 15, 'admin': 5}
+
+REVIEW_TEXTS = (
+    'Смотрится на одном дыхании.',
+    'Ожидал большего, но в целом неплохо.',
+    'Одно из лучших произведений жанра.',
+    'Сюжет предсказуем, зато атмосфера отличная.',
+    'Пересматривал несколько раз и не надоедает.',
+    'Не понравилось: затянуто и скучно.',
+)
+
+COMMENT_TEXTS = (
+    'Согласен.',
+    'Не соглашусь, мне понравилось.',
+    'Спасибо за отзыв!',
+    'Вы точно смотрели до конца?',
+)
+
+DATES_SPAN_SECONDS = 10 * 365 * 24 * 60 * 60
+
+FIRST_YEAR = 1900
+
+
+class PythonRandom:
+    """Генерация на модуле random: медленнее, но без зависимостей."""
+
+    def __init__(self, seed):
+        self.random = random.Random(seed)
+
+    def integers(self, low, high, size):
+        """size целых чисел из [low, high)."""
+        return [self.random.randrange(low, high) for _ in range(size)]
+
+    def weighted(self, values, weights, size):
+        return self.random.choices(values, weights=weights, k=size)
+
+    def multinomial(self, total, weights):
+        counts = [0] * len(weights)
+        for index in self.random.choices(
+            range(len(weights)), weights=weights, k=total
+        ):
+            counts[index] += 1
+        return counts
+
+    def shuffle(self, values):
+        self.random.shuffle(values)
+        return values
+
+    def distinct_groups(self, population, counts):
+        """Для каждой группы - counts[i] различных чисел из [0, population)."""
+        values = []
+        for count in counts:
+            values.extend(self.random.sample(range(population), count))
+        return values
+
+    def timestamps(self, size):
+        now = int(time.time())
+        return [
+            datetime.fromtimestamp(
+                self.random.randrange(now - DATES_SPAN_SECONDS, now),
+                timezone.utc
+            ).strftime('%Y-%m-%dT%H:%M:%SZ')
+            for _ in range(size)
+        ]
+
+
+class NumpyRandom:
+    """Векторная генерация на NumPy для миллионов строк."""
+
+    def __init__(self, seed):
+        self.rng = np.random.default_rng(seed)
+
+    def integers(self, low, high, size):
+        return self.rng.integers(low, high, size).tolist()
+
+    def weighted(self, values, weights, size):
+        weights = np.asarray(weights, dtype=float)
+        indexes = self.rng.choice(len(values), size, p=weights / weights.sum())
+        return np.asarray(values, dtype=object)[indexes].tolist()
+
+    def multinomial(self, total, weights):
+        weights = np.asarray(weights, dtype=float)
+        return self.rng.multinomial(total, weights / weights.sum()).tolist()
+
+    def shuffle(self, values):
+        self.rng.shuffle(values)
+        return values
+
+    def distinct_groups(self, population, counts):
+        """
+        Для каждой группы - counts[i] различных чисел из [0, population).
+
+        Группа - арифметическая прогрессия по модулю population со
+        случайными началом и шагом, взаимно простым с population:
+        такие значения не повторяются, пока count <= population.
+        """
+        counts = np.asarray(counts)
+        if not counts.sum():
+            return []
+        starts = self.rng.integers(0, population, len(counts))
+        strides = self.rng.integers(1, max(population, 2), len(counts))
+        while True:
+            shared = np.gcd(strides, population) != 1
+            if not shared.any():
+                break
+            strides[shared] = self.rng.integers(
+                1, population, shared.sum()
+            )
+        group_starts = np.cumsum(counts) - counts
+        positions = np.arange(counts.sum()) - np.repeat(group_starts, counts)
+        values = (
+            np.repeat(starts, counts)
+            + positions * np.repeat(strides, counts)
+        )
+        return (values % population).tolist()
+
+    def timestamps(self, size):
+        now = int(time.time())
+        seconds = self.rng.integers(now - DATES_SPAN_SECONDS, now, size)
+        return np.datetime_as_string(
+            seconds.astype('datetime64[s]'), timezone='UTC'
+        ).tolist()
+
+
+def get_random(seed, use_numpy=True):
+    if use_numpy and np is not None:
+        return NumpyRandom(seed)
+    return PythonRandom(seed)
+
+
+class FakeDataGenerator:
+    """
+    Синтетические данные в формате CSV-файлов add_db_csv.
+
+    Число отзывов на произведение распределено по Ципфу: немногие
+    произведения собирают большинство отзывов. Авторы отзывов одного
+    произведения различны (ограничение unique_review), поэтому отзывов
+    на произведение не больше, чем пользователей.
+    """
+
+    def __init__(self, counts, start_ids, zipf_exponent=1.1, seed=None,
+                 batch_size=5000, use_numpy=True):
+        self.counts = counts
+        self.start_ids = start_ids
+        self.zipf_exponent = zipf_exponent
+        self.batch_size = batch_size
+        self.random = get_random(seed, use_numpy)
+        self.current_year = datetime.now(timezone.utc).year
+
+    def ids(self, table, count):
+        return range(self.start_ids[table], self.start_ids[table] + count)
+
+    def tables(self):
+        """Таблицы в порядке загрузки: (имя, столбцы, пачки строк)."""
+        return (
+            ('category', ('id', 'name', 'slug'), self.slugged('category')),
+            ('genre', ('id', 'name', 'slug'), self.slugged('genre')),
+            ('users', ('id', 'username', 'email', 'role', 'bio',
+                       'first_name', 'last_name'), self.users()),
+            ('titles', ('id', 'name', 'year', 'category_id'), self.titles()),
+            ('review', ('id', 'title_id', 'text', 'author_id', 'score',
+                        'pub_date'), self.reviews()),
+            ('comments', ('id', 'review_id', 'text', 'author_id',
+                          'pub_date'), self.comments()),
+            ('genre_title', ('id', 'title_id', 'genre_id'),
+             self.title_genres()),
+        )
+
+    def batched(self, ids, make_rows):
+        for start in range(0, len(ids), self.batch_size):
+            yield make_rows(ids[start:start + self.batch_size])
+
+    def slugged(self, table):
+        name = 'Категория' if table == 'category' else 'Жанр'
+        return self.batched(self.ids(table, self.counts[table]), lambda ids: [
+            (pk, f'{name} {pk}', f'fake-{table}-{pk}') for pk in ids
+        ])
+
+    def users(self):
+        def make_rows(ids):
+            roles = self.random.weighted(
+                list(ROLE_WEIGHTS), list(ROLE_WEIGHTS.values()), len(ids)
+            )
+            return [
+                (pk, f'fake_user_{pk}', f'fake_user_{pk}@yamdb.fake', role,
+                 '', '', '')
+                for pk, role in zip(ids, roles)
+            ]
+        return self.batched(self.ids('users', self.counts['users']), make_rows)
+
+    def titles(self):
+        categories = self.counts['category']
+
+        def make_rows(ids):
+            years = self.random.integers(
+                FIRST_YEAR, self.current_year + 1, len(ids)
+            )
+            category_ids = [None] * len(ids)
+            if categories:
+                category_ids = [
+                    self.start_ids['category'] + category
+                    for category in self.random.integers(
+                        0, categories, len(ids)
+                    )
+                ]
+            return [
+                (pk, f'Произведение {pk}', year, category_id)
+                for pk, year, category_id in zip(ids, years, category_ids)
+            ]
+        return self.batched(
+            self.ids('titles', self.counts['titles']), make_rows
+        )
+
+    def review_counts(self):
+        """
+        Количество отзывов каждого произведения по закону Ципфа.
+
+        Отзывы сверх числа пользователей переходят к произведениям, у
+        которых ещё есть свободные авторы, пропорционально их весам.
+        Всего отзывов не больше, чем произведений, умноженных на
+        пользователей.
+        """
+        titles, users = self.counts['titles'], self.counts['users']
+        counts = [0] * titles
+        total = min(self.counts['review'], titles * users)
+        weights = self.random.shuffle([
+            rank ** -self.zipf_exponent for rank in range(1, titles + 1)
+        ])
+        remaining = total
+        while remaining:
+            weights = [
+                weight if count < users else 0
+                for weight, count in zip(weights, counts)
+            ]
+            counts = [
+                min(count + added, users) for count, added in zip(
+                    counts, self.random.multinomial(remaining, weights)
+                )
+            ]
+            remaining = total - sum(counts)
+        return counts
+
+    def reviews(self):
+        counts = self.review_counts()
+        self.reviews_total = sum(counts)
+        review_id = self.start_ids['review']
+        title_start = 0
+        while title_start < len(counts):
+            title_end, size = title_start, 0
+            while title_end < len(counts) and size < self.batch_size:
+                size += counts[title_end]
+                title_end += 1
+            chunk_counts = counts[title_start:title_end]
+            title_ids = [
+                self.start_ids['titles'] + index
+                for index, count in enumerate(chunk_counts, title_start)
+                for _ in range(count)
+            ]
+            authors = self.random.distinct_groups(
+                self.counts['users'], chunk_counts
+            )
+            texts = self.random.integers(0, len(REVIEW_TEXTS), size)
+            scores = self.random.weighted(
+                list(range(1, len(SCORE_WEIGHTS) + 1)), SCORE_WEIGHTS, size
+            )
+            dates = self.random.timestamps(size)
+            yield [
+                (review_id + offset, title_id, REVIEW_TEXTS[text],
+                 self.start_ids['users'] + author, score, pub_date)
+                for offset, (title_id, text, author, score, pub_date)
+                in enumerate(zip(title_ids, texts, authors, scores, dates))
+            ]
+            review_id += size
+            title_start = title_end
+
+    def comments(self):
+        # Отзывы генерируются раньше, их количество уже известно.
+        reviews = self.reviews_total
+        if not reviews or not self.counts['users']:
+            return
+
+        def make_rows(ids):
+            review_ids = self.random.integers(0, reviews, len(ids))
+            authors = self.random.integers(0, self.counts['users'], len(ids))
+            texts = self.random.integers(0, len(COMMENT_TEXTS), len(ids))
+            dates = self.random.timestamps(len(ids))
+            return [
+                (pk, self.start_ids['review'] + review, COMMENT_TEXTS[text],
+                 self.start_ids['users'] + author, pub_date)
+                for pk, review, author, text, pub_date
+                in zip(ids, review_ids, authors, texts, dates)
+            ]
+        yield from self.batched(
+            self.ids('comments', self.counts['comments']), make_rows
+        )
+
+    def title_genres(self):
+        genres = self.counts['genre']
+        if not genres:
+            return
+        pk = self.start_ids['genre_title']
+        for title_ids in self.batched(
+            self.ids('titles', self.counts['titles']), list
+        ):
+            counts = self.random.integers(
+                1, min(3, genres) + 1, len(title_ids)
+            )
+            genre_ids = self.random.distinct_groups(genres, counts)
+            genre_ids = iter(genre_ids)
+            rows = [
+                (title_id, self.start_ids['genre'] + next(genre_ids))
+                for title_id, count in zip(title_ids, counts)
+                for _ in range(count)
+            ]
+            yield [
+                (pk + offset, title_id, genre_id)
+                for offset, (title_id, genre_id) in enumerate(rows)
+            ]
+            pk += len(rows)
@@ -0,0 +1,62 @@
+from django.db import transaction
+
+from reviews.consts import LEADERBOARD_PRIOR_SCORE, LEADERBOARD_PRIOR_WEIGHT
+from reviews.models import LeaderboardEntry, Title
+
+
+def weighted_rating(score_sum, review_count):
+    """
+    Байесовская оценка произведения.
+
+    Средняя оценка сглаживается к LEADERBOARD_PRIOR_SCORE так, будто у
+    произведения есть ещё LEADERBOARD_PRIOR_WEIGHT отзывов с этой оценкой:
+    единственный отзыв на 10 баллов не обгоняет много хороших отзывов.
+    """
+    return (
+        (score_sum + LEADERBOARD_PRIOR_WEIGHT * LEADERBOARD_PRIOR_SCORE)
+        / (review_count + LEADERBOARD_PRIOR_WEIGHT)
+    )
+
+
+def build_entries(title):
+    rating = weighted_rating(title.score_sum, title.review_count)
+    return [
+        LeaderboardEntry(
+            title_id=title.pk,
+            genre=genre,
+            category_id=title.category_id,
+            weighted_rating=rating,
+            review_count=title.review_count,
+        )
+        for genre in (None, *title.genre.all())
+    ]
+
+
+def refresh_leaderboard(*title_ids):
+    """Пересобирает строки рейтинга для указанных произведений."""
+    titles = Title.objects.filter(
+        pk__in=title_ids, review_count__gt=0
+    ).prefetch_related('genre')
+    with transaction.atomic():
+        LeaderboardEntry.objects.filter(title_id__in=title_ids).delete()
+        LeaderboardEntry.objects.bulk_create(
+            entry for title in titles for entry in build_entries(title)
+        )
+
+
+def rebuild_leaderboard(batch_size=1000):
+    """Полностью пересобирает рейтинг, например после массового импорта."""
+    titles = Title.objects.filter(
+        review_count__gt=0
+    ).order_by('pk').prefetch_related('genre')
+    with transaction.atomic():
+        LeaderboardEntry.objects.all().delete()
+        last_pk = 0
+        while True:
+            chunk = list(titles.filter(pk__gt=last_pk)[:batch_size])
+            if not chunk:
+                break
+            LeaderboardEntry.objects.bulk_create(
+                entry for title in chunk for entry in build_entries(title)
+            )
+            last_pk = chunk[-1].pk
@@ -1,47 +1,315 @@
 import csv
+import gzip
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from operator import itemgetter
+from pathlib import Path
+
 from django.apps import apps
-from django.core.management.base import BaseCommand
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F
 
-from reviews.models import Category, Comment, Genre, Review, Title, User
+from reviews.consts import CSV_BATCH_SIZE, CSV_PROGRESS_INTERVAL
+from reviews.csv_import import (
+    ChunkReader, ForeignKeyChecker, file_hash, init_worker, validate_chunk
+)
+from reviews.derived import rebuild_derived_data
+from reviews.models import (
+    Category, Comment, CsvImportCheckpoint, Genre, Review, Title, User
+)
 
 
 TitleGenre = apps.get_model('reviews', 'title_genre')
 
 DATA_SOURCES_FOR_MOVIE_DATABASE = {
-    Category: 'static/data/category.csv',
-    Genre: 'static/data/genre.csv',
-    User: 'static/data/users.csv',
-    Title: 'static/data/titles.csv',
-    Review: 'static/data/review.csv',
-    Comment: 'static/data/comments.csv',
-    TitleGenre: 'static/data/genre_title.csv',
+    Category: 'category.csv',
+    Genre: 'genre.csv',
+    User: 'users.csv',
+    Title: 'titles.csv',
+    Review: 'review.csv',
+    Comment: 'comments.csv',
+    TitleGenre: 'genre_title.csv',
 }
 
+DEFAULT_DATA_DIR = settings.BASE_DIR / 'static' / 'data'
+
+
+def reset_sequences():
+    """Сдвигает автоинкремент за явно загруженные id (как loaddata)."""
+    statements = connection.ops.sequence_reset_sql(
+        no_style(), list(DATA_SOURCES_FOR_MOVIE_DATABASE)
+    )
+    if statements:
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
+
+
+def source_path(data_dir, file_name):
+    """Путь к файлу данных; сжатый вариант от dump_db_csv --gzip."""
+    path = data_dir / file_name
+    compressed = data_dir / f'{file_name}.gz'
+    if not path.exists() and compressed.exists():
+        return compressed
+    return path
+
+
+@contextmanager
+def keep_csv_dates(model, columns):
+    """
+    Отключает auto_now_add у полей, значения которых есть в CSV.
+
+    Иначе bulk_create заменил бы даты публикации из файла текущим
+    временем.
+    """
+    fields = [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now_add', False) and field.attname in columns
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
 
 class Command(BaseCommand):
     help = 'Заполняет базу данных данными из CSV-файлов'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--data-dir', type=Path, default=DEFAULT_DATA_DIR,
+            help='Каталог с CSV-файлами.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=CSV_BATCH_SIZE,
+            help='Количество строк в одном INSERT.'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count(),
+            help='Процессов для разбора и проверки строк; 1 - без пула.'
+        )
+        parser.add_argument(
+            '--reject-file', type=Path, default=Path('rejected_rows.csv'),
+            help='Файл для строк, не прошедших проверку.'
+        )
+        parser.add_argument(
+            '--resume', action='store_true',
+            help='Продолжить прерванную загрузку с контрольной точки.'
+        )
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Загружать и файлы, не изменившиеся с прошлой загрузки.'
+        )
+        conflicts = parser.add_mutually_exclusive_group()
+        conflicts.add_argument(
+            '--ignore-conflicts', action='store_true',
+            help='Пропускать строки, уже существующие в базе.'
+        )
+        conflicts.add_argument(
+            '--upsert', action='store_true',
+            help='Обновлять строки, уже существующие в базе.'
+        )
+
     def handle(self, *args, **options):
-        for key, value in DATA_SOURCES_FOR_MOVIE_DATABASE.items():
-            csv_file = value
-
-            # Получаем модель
-            try:
-                model = key
-            except NameError:
-                self.stdout.write(self.style.ERROR('Модель не найдена'))
-                return
-
-            # Заполняем модель данными из CSV-файла
-            with open(csv_file, 'r', encoding='utf-8') as file:
-                reader = csv.DictReader(file)
-                for row in reader:
-                    model.objects.get_or_create(**row)
-
-            self.stdout.write(self.style.SUCCESS(
-                f'Данные из {csv_file} успешно загружены в базу данных'
-            ))
+        self.batch_size = options['batch_size']
+        self.ignore_conflicts = options['ignore_conflicts']
+        self.upsert = options['upsert']
+        self.resume = options['resume']
+        self.force = options['force']
+        self.reject_path = options['reject_file']
+        self.reject_file = self.reject_writer = None
+        self.rejected = 0
+        self.fk_checker = ForeignKeyChecker()
+        workers = options['workers']
+        self.executor = None
+        if workers > 1:
+            self.executor = ProcessPoolExecutor(
+                max_workers=workers, initializer=init_worker
+            )
+            self.max_pending = workers * 2
+        try:
+            for model, file_name in DATA_SOURCES_FOR_MOVIE_DATABASE.items():
+                self.load_file(
+                    model, source_path(options['data_dir'], file_name)
+                )
+        finally:
+            if self.executor is not None:
+                self.executor.shutdown(cancel_futures=True)
+            if self.reject_file is not None:
+                self.reject_file.close()
 
+        # bulk_create не вызывает сигналы, поэтому рейтинги, счётчики
+        # и версии каталога пересчитываются один раз после загрузки.
+        rebuild_derived_data()
+        reset_sequences()
+        if self.rejected:
+            self.stdout.write(self.style.WARNING(
+                f'Отклонено строк: {self.rejected}, см. {self.reject_path}'
+            ))
         self.stdout.write(self.style.SUCCESS(
             'Все данные успешно загружены в базу данных!'
         ))
+
+    def load_file(self, model, csv_file):
+        """
+        Загружает файл пачками bulk_create.
+
+        Порции разбираются и проверяются в пуле процессов, а пишет
+        в базу только текущий процесс. Каждая пачка фиксируется в одной
+        транзакции с контрольной точкой, поэтому с --resume загрузка
+        продолжается после последней записанной пачки.
+        """
+        content_hash = file_hash(csv_file)
+        checkpoint = CsvImportCheckpoint.objects.filter(
+            pk=csv_file.name
+        ).first()
+        same_content = (
+            checkpoint is not None
+            and checkpoint.content_hash == content_hash
+        )
+        if same_content and checkpoint.completed and not self.force:
+            self.stdout.write(
+                f'{csv_file} не изменился с последней загрузки, пропущен'
+            )
+            return
+        if not (self.resume and same_content and not checkpoint.completed):
+            checkpoint = CsvImportCheckpoint(
+                file_name=csv_file.name, content_hash=content_hash
+            )
+            checkpoint.save()
+        started = last_report = time.monotonic()
+        loaded = 0
+        opener = gzip.open if csv_file.suffix == '.gz' else open
+        with opener(csv_file, 'rb') as file:
+            reader = ChunkReader(file, self.batch_size)
+            if checkpoint.offset:
+                reader.seek(checkpoint.offset, checkpoint.line)
+                self.stdout.write(
+                    f'{csv_file}: продолжение со строки {checkpoint.line + 1}'
+                )
+            columns = reader.columns
+            with keep_csv_dates(model, columns):
+                for (valid, rejected), offset, line in self.validated_chunks(
+                    model, columns, reader.chunks()
+                ):
+                    objs = []
+                    for row_line, values in valid:
+                        error = self.fk_checker.check(model, values)
+                        if error is None:
+                            objs.append(model(**values))
+                        else:
+                            rejected.append((row_line, [
+                                values[field.attname] for field in (
+                                    model._meta.get_field(column)
+                                    for column in columns
+                                )
+                            ], error))
+                    self.reject(csv_file, rejected)
+                    try:
+                        with transaction.atomic():
+                            self.write_batch(model, columns, objs)
+                            CsvImportCheckpoint.objects.filter(
+                                pk=checkpoint.pk
+                            ).update(
+                                offset=offset,
+                                line=line,
+                                rows_loaded=F('rows_loaded') + len(objs),
+                            )
+                    except IntegrityError as error:
+                        raise CommandError(
+                            f'{csv_file}: {error}. Для повторной загрузки '
+                            'используйте --ignore-conflicts или --upsert, '
+                            'для продолжения с этого места - --resume.'
+                        )
+                    self.fk_checker.add(model, [obj.pk for obj in objs])
+                    loaded += len(objs)
+                    now = time.monotonic()
+                    if now - last_report >= CSV_PROGRESS_INTERVAL:
+                        self.report(csv_file, loaded, now - started)
+                        last_report = now
+        CsvImportCheckpoint.objects.filter(pk=checkpoint.pk).update(
+            completed=True
+        )
+        self.report(csv_file, loaded, time.monotonic() - started)
+        self.stdout.write(self.style.SUCCESS(
+            f'Данные из {csv_file} успешно загружены в базу данных'
+        ))
+
+    def validated_chunks(self, model, columns, chunks):
+        """
+        Проверенные порции в порядке файла с позицией их конца.
+
+        В пуле одновременно находится не больше max_pending порций,
+        поэтому память не зависит от размера файла.
+        """
+        label = model._meta.label
+        if self.executor is None:
+            for chunk, offset, line in chunks:
+                yield validate_chunk(label, columns, chunk), offset, line
+            return
+        pending = deque()
+        for chunk, offset, line in chunks:
+            pending.append((
+                self.executor.submit(validate_chunk, label, columns, chunk),
+                offset, line
+            ))
+            if len(pending) >= self.max_pending:
+                future, offset, line = pending.popleft()
+                yield future.result(), offset, line
+        while pending:
+            future, offset, line = pending.popleft()
+            yield future.result(), offset, line
+
+    def reject(self, csv_file, rejected):
+        """Записывает отклонённые строки с номерами и причинами."""
+        if not rejected:
+            return
+        if self.reject_writer is None:
+            self.reject_file = open(
+                self.reject_path, 'a' if self.resume else 'w',
+                encoding='utf-8', newline=''
+            )
+            self.reject_writer = csv.writer(self.reject_file)
+            if not self.reject_file.tell():
+                self.reject_writer.writerow(('file', 'line', 'error', 'row'))
+        for line, values, error in sorted(rejected, key=itemgetter(0)):
+            self.reject_writer.writerow(
+                (csv_file.name, line, error, *values)
+            )
+        self.rejected += len(rejected)
+
+    def write_batch(self, model, columns, objs):
+        if not self.upsert:
+            model.objects.bulk_create(
+                objs, ignore_conflicts=self.ignore_conflicts
+            )
+            return
+        existing = set(model.objects.filter(
+            pk__in=[obj.pk for obj in objs]
+        ).values_list('pk', flat=True))
+        model.objects.bulk_create(
+            obj for obj in objs if obj.pk not in existing
+        )
+        update_fields = [
+            field.name for field in model._meta.concrete_fields
+            if field.attname in columns and not field.primary_key
+        ]
+        model.objects.bulk_update(
+            [obj for obj in objs if obj.pk in existing], update_fields
+        )
+
+    def report(self, csv_file, loaded, elapsed):
+        rate = loaded / elapsed if elapsed else loaded
+        self.stdout.write(
+            f'{csv_file}: {loaded} строк за {elapsed:.1f} с '
+            f'({rate:.0f} строк/с)'
+        )
@@ -0,0 +1,81 @@
+import random
+import sqlite3
+import time
+
+from django.core.management.base import BaseCommand
+
+from reviews.search import (
+    CREATE_TITLE_FTS_SQL, TITLE_FTS_TABLE, build_match_query
+)
+
+SYLLABLES = (
+    'ба', 'ве', 'го', 'ду', 'же', 'зи', 'ка', 'ле', 'мо', 'ну', 'по', 'ра',
+    'си', 'то', 'фе', 'ха', 'ча', 'ши', 'ер', 'ин', 'ост', 'ров', 'тай', 'на',
+)
+WORDS = [a + b + c for a in SYLLABLES for b in SYLLABLES for c in SYLLABLES]
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает время поиска произведений через LIKE и FTS5 '
+        'на синтетическом каталоге в памяти'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--titles', type=int, default=1_000_000)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('queries', nargs='*', default=[
+            'остров', 'тайна бара', 'кале', 'несуществующее'
+        ])
+
+    def handle(self, *args, **options):
+        connection = sqlite3.connect(':memory:')
+        self.fill_catalogue(connection, options['titles'])
+        for query in options['queries']:
+            like_time, like_count = self.measure(
+                connection, options['repeat'],
+                'SELECT id FROM reviews_title '
+                'WHERE name LIKE ? OR description LIKE ?',
+                (f'%{query}%', f'%{query}%')
+            )
+            fts_time, fts_count = self.measure(
+                connection, options['repeat'],
+                f'SELECT rowid FROM {TITLE_FTS_TABLE} '
+                f'WHERE {TITLE_FTS_TABLE} MATCH ? ORDER BY rank LIMIT 10',
+                (build_match_query(query),)
+            )
+            self.stdout.write(
+                f'{query!r}: LIKE {like_time * 1000:.1f} мс '
+                f'({like_count} строк), '
+                f'FTS5 {fts_time * 1000:.1f} мс (топ-{fts_count})'
+            )
+
+    def fill_catalogue(self, connection, count):
+        started = time.perf_counter()
+        connection.execute(
+            'CREATE TABLE reviews_title ('
+            'id INTEGER PRIMARY KEY, name TEXT, description TEXT)'
+        )
+        rows = (
+            (
+                ' '.join(random.choices(WORDS, k=random.randint(1, 4))),
+                ' '.join(random.choices(WORDS, k=random.randint(5, 20))),
+            )
+            for _ in range(count)
+        )
+        connection.executemany(
+            'INSERT INTO reviews_title(name, description) VALUES (?, ?)', rows
+        )
+        for statement in CREATE_TITLE_FTS_SQL:
+            connection.execute(statement)
+        connection.commit()
+        self.stdout.write(
+            f'Каталог из {count} произведений построен за '
+            f'{time.perf_counter() - started:.1f} с'
+        )
+
+    def measure(self, connection, repeat, sql, params):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            rows = connection.execute(sql, params).fetchall()
+        return (time.perf_counter() - started) / repeat, len(rows)
@@ -0,0 +1,74 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from reviews.consts import EXPORT_CHUNK_SIZE
+from reviews.csv_export import WRITERS, dump_model
+from reviews.csv_import import init_worker
+from reviews.management.commands.add_db_csv import (
+    DATA_SOURCES_FOR_MOVIE_DATABASE
+)
+
+
+class Command(BaseCommand):
+    help = 'Выгружает базу данных в CSV-файлы в формате add_db_csv'
+
+    def add_arguments(self, parser):
+        parser.add_argument('output_dir', type=Path)
+        parser.add_argument(
+            '--format', choices=tuple(WRITERS), default='csv',
+            dest='output_format',
+            help='csv - формат add_db_csv, ndjson - по объекту на строку.'
+        )
+        parser.add_argument(
+            '--gzip', action='store_true',
+            help='Сжимать файлы (к имени добавляется .gz).'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=EXPORT_CHUNK_SIZE,
+            help='Строк, читаемых из базы за один раз.'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count(),
+            help='Процессов для параллельной выгрузки таблиц; 1 - без пула.'
+        )
+
+    def handle(self, *args, **options):
+        output_dir = options['output_dir']
+        output_dir.mkdir(parents=True, exist_ok=True)
+        suffix = '.gz' if options['gzip'] else ''
+        tasks = []
+        for model, file_name in DATA_SOURCES_FOR_MOVIE_DATABASE.items():
+            if options['output_format'] != 'csv':
+                file_name = Path(file_name).with_suffix(
+                    f'.{options["output_format"]}'
+                ).name
+            tasks.append((
+                model._meta.label, output_dir / f'{file_name}{suffix}',
+                options['output_format'], options['gzip'],
+                options['chunk_size']
+            ))
+        started = time.monotonic()
+        workers = min(options['workers'], len(tasks))
+        if workers > 1:
+            # Процессы-обработчики открывают свои соединения: унаследованное
+            # при fork соединение нельзя использовать из двух процессов.
+            connections.close_all()
+            with ProcessPoolExecutor(
+                max_workers=workers, initializer=init_worker
+            ) as executor:
+                counts = list(executor.map(dump_model, *zip(*tasks)))
+        else:
+            counts = [dump_model(*task) for task in tasks]
+        for (_, path, *_), count in zip(tasks, counts):
+            self.stdout.write(f'{path}: {count} строк')
+        elapsed = time.monotonic() - started
+        total = sum(counts)
+        self.stdout.write(self.style.SUCCESS(
+            f'Выгружено {total} строк за {elapsed:.1f} с '
+            f'({total / elapsed if elapsed else total:.0f} строк/с)'
+        ))
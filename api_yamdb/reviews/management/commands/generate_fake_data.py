@@ -0,0 +1,126 @@
+import csv
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max
+
+from reviews.consts import CSV_BATCH_SIZE
+from reviews.derived import rebuild_derived_data
+from reviews.fake_data import FakeDataGenerator, np
+from reviews.management.commands.add_db_csv import (
+    DATA_SOURCES_FOR_MOVIE_DATABASE, keep_csv_dates, reset_sequences
+)
+
+# Имя таблицы генератора совпадает с именем CSV-файла без расширения.
+TABLES = {
+    Path(file_name).stem: (model, file_name)
+    for model, file_name in DATA_SOURCES_FOR_MOVIE_DATABASE.items()
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Создаёт синтетические данные для нагрузочного тестирования: '
+        'в базе или в CSV-файлах для add_db_csv'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--titles', type=int, default=1000)
+        parser.add_argument('--genres', type=int, default=20)
+        parser.add_argument('--categories', type=int, default=5)
+        parser.add_argument('--reviews', type=int, default=10000)
+        parser.add_argument('--comments', type=int, default=10000)
+        parser.add_argument(
+            '--zipf-exponent', type=float, default=1.1,
+            help='Показатель закона Ципфа для отзывов на произведение.'
+        )
+        parser.add_argument('--seed', type=int, default=None)
+        parser.add_argument('--batch-size', type=int, default=CSV_BATCH_SIZE)
+        parser.add_argument(
+            '--output-dir', type=Path, default=None,
+            help='Записать CSV-файлы в каталог вместо загрузки в базу.'
+        )
+        parser.add_argument(
+            '--no-numpy', action='store_true',
+            help='Генерировать модулем random, даже если NumPy установлен.'
+        )
+
+    def handle(self, *args, **options):
+        counts = {
+            'users': options['users'],
+            'titles': options['titles'],
+            'genre': options['genres'],
+            'category': options['categories'],
+            'review': options['reviews'],
+            'comments': options['comments'],
+        }
+        output_dir = options['output_dir']
+        if output_dir is None:
+            start_ids = {
+                table: (model.objects.aggregate(Max('pk'))['pk__max'] or 0)
+                + 1
+                for table, (model, _) in TABLES.items()
+            }
+        else:
+            output_dir.mkdir(parents=True, exist_ok=True)
+            start_ids = dict.fromkeys(TABLES, 1)
+        use_numpy = not options['no_numpy']
+        if use_numpy and np is None:
+            self.stdout.write(self.style.WARNING(
+                'NumPy не установлен, данные генерируются модулем random'
+            ))
+        generator = FakeDataGenerator(
+            counts, start_ids,
+            zipf_exponent=options['zipf_exponent'],
+            seed=options['seed'],
+            batch_size=options['batch_size'],
+            use_numpy=use_numpy,
+        )
+        for table, columns, batches in generator.tables():
+            started = time.monotonic()
+            model, file_name = TABLES[table]
+            if output_dir is None:
+                written = self.save_table(model, columns, batches)
+            else:
+                written = self.write_table(
+                    output_dir / file_name, columns, batches
+                )
+            elapsed = time.monotonic() - started
+            self.stdout.write(
+                f'{table}: {written} строк за {elapsed:.1f} с '
+                f'({written / elapsed if elapsed else written:.0f} строк/с)'
+            )
+
+        if generator.reviews_total < counts['review']:
+            self.stdout.write(self.style.WARNING(
+                f'Создано отзывов: {generator.reviews_total} вместо '
+                f'{counts["review"]}: у произведения не больше одного '
+                'отзыва каждого пользователя, увеличьте --users или --titles'
+            ))
+        if output_dir is None:
+            rebuild_derived_data()
+            reset_sequences()
+        self.stdout.write(self.style.SUCCESS('Данные созданы'))
+
+    def save_table(self, model, columns, batches):
+        written = 0
+        with transaction.atomic(), keep_csv_dates(model, columns):
+            for rows in batches:
+                model.objects.bulk_create(
+                    model(**dict(zip(columns, row))) for row in rows
+                )
+                written += len(rows)
+        return written
+
+    def write_table(self, path, columns, batches):
+        written = 0
+        with open(path, 'w', encoding='utf-8', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(columns)
+            for rows in batches:
+                writer.writerows(rows)
+                written += len(rows)
+        return written
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from reviews.leaderboard import rebuild_leaderboard
+from reviews.models import LeaderboardEntry
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает рейтинг лучших произведений'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        rebuild_leaderboard(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Рейтинг пересобран: {LeaderboardEntry.objects.count()} строк'
+        ))
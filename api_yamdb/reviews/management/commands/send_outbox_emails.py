@@ -0,0 +1,101 @@
+import time
+
+from django.core.mail import EmailMessage, get_connection
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import F
+from django.utils import timezone
+
+from reviews.models import OutgoingEmail
+
+
+class Command(BaseCommand):
+    help = 'Отправляет письма из очереди исходящих писем'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--max-attempts', type=int, default=5)
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Не завершаться, а проверять очередь каждые --interval с'
+        )
+        parser.add_argument('--interval', type=float, default=5)
+
+    def handle(self, *args, **options):
+        while True:
+            try:
+                sent, failed = self.drain(
+                    options['batch_size'], options['max_attempts']
+                )
+            except OSError as error:
+                message = f'Почтовый сервер недоступен: {error}'
+                if not options['loop']:
+                    raise CommandError(message)
+                self.stderr.write(self.style.ERROR(message))
+                sent = failed = 0
+            if sent or failed:
+                self.stdout.write(
+                    f'Отправлено писем: {sent}, ошибок: {failed}'
+                )
+            if not options['loop']:
+                return
+            if not sent:
+                time.sleep(options['interval'])
+
+    def drain(self, batch_size, max_attempts):
+        """
+        Отправляет все ожидающие письма пачками по batch_size.
+
+        Соединение с почтовым сервером открывается один раз на весь проход
+        и только если в очереди есть письма: в режиме --loop пустая очередь
+        не стоит подключения к серверу. Письмо, не отправленное
+        max_attempts раз, больше не выбирается.
+
+        Если сервер недоступен, ошибка подключения записывается в
+        last_error первой пачки и пробрасывается дальше. Попытки при этом
+        не расходуются: письма не виноваты в сбое сервера.
+        """
+        pending = OutgoingEmail.objects.filter(
+            sent_at__isnull=True, attempts__lt=max_attempts
+        ).order_by('pk')
+        sent_total = failed_total = 0
+        batch = list(pending[:batch_size])
+        if not batch:
+            return sent_total, failed_total
+        connection = get_connection()
+        try:
+            connection.open()
+        except OSError as error:
+            OutgoingEmail.objects.filter(
+                pk__in=[email.pk for email in batch]
+            ).update(last_error=str(error))
+            raise
+        with connection:
+            while batch:
+                sent_ids = []
+                for email in batch:
+                    message = EmailMessage(
+                        subject=email.subject,
+                        body=email.message,
+                        from_email=email.from_email,
+                        to=[email.recipient],
+                        connection=connection,
+                    )
+                    try:
+                        message.send()
+                    except Exception as error:
+                        failed_total += 1
+                        OutgoingEmail.objects.filter(pk=email.pk).update(
+                            attempts=F('attempts') + 1,
+                            last_error=str(error),
+                        )
+                    else:
+                        sent_ids.append(email.pk)
+                OutgoingEmail.objects.filter(pk__in=sent_ids).update(
+                    sent_at=timezone.now(),
+                    attempts=F('attempts') + 1,
+                )
+                sent_total += len(sent_ids)
+                batch = list(
+                    pending.filter(pk__gt=batch[-1].pk)[:batch_size]
+                )
+        return sent_total, failed_total
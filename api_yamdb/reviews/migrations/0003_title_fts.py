@@ -0,0 +1,26 @@
+from django.db import migrations
+
+from reviews.search import CREATE_TITLE_FTS_SQL, DROP_TITLE_FTS_SQL
+
+
+def execute_on_sqlite(statements):
+    def operation(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0002_title_rating_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            execute_on_sqlite(CREATE_TITLE_FTS_SQL),
+            execute_on_sqlite(DROP_TITLE_FTS_SQL),
+        ),
+    ]
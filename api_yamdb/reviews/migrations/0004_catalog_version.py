@@ -0,0 +1,25 @@
+# Generated by Django 3.2 on 2026-10-18 04:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0003_title_fts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogVersion',
+            fields=[
+                ('scope', models.CharField(choices=[('titles', 'Произведения'), ('categories', 'Категории'), ('genres', 'Жанры')], max_length=20, primary_key=True, serialize=False, verbose_name='Раздел')),
+                ('version', models.PositiveBigIntegerField(default=0, verbose_name='Версия')),
+                ('modified', models.DateTimeField(auto_now=True, verbose_name='Время изменения')),
+            ],
+            options={
+                'verbose_name': 'Версия раздела каталога',
+                'verbose_name_plural': 'Версии разделов каталога',
+            },
+        ),
+    ]
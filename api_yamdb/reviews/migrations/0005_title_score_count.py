@@ -0,0 +1,45 @@
+# Generated by Django 3.2 on 2026-10-18 04:38
+
+from django.db import migrations, models
+from django.db.models import Count
+import django.db.models.deletion
+
+
+def fill_score_counts(apps, schema_editor):
+    Review = apps.get_model('reviews', 'Review')
+    TitleScoreCount = apps.get_model('reviews', 'TitleScoreCount')
+    score_counts = Review.objects.order_by().values(
+        'title_id', 'score'
+    ).annotate(count=Count('id'))
+    TitleScoreCount.objects.bulk_create(
+        TitleScoreCount(**score_count) for score_count in score_counts
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0004_catalog_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleScoreCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.SmallIntegerField(verbose_name='Оценка')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Количество отзывов')),
+                ('title', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='score_counts', to='reviews.title', verbose_name='Произведение')),
+            ],
+            options={
+                'verbose_name': 'Количество оценок',
+                'verbose_name_plural': 'Гистограммы оценок',
+                'default_related_name': 'score_counts',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='titlescorecount',
+            constraint=models.UniqueConstraint(fields=('title', 'score'), name='unique_title_score'),
+        ),
+        migrations.RunPython(fill_score_counts, migrations.RunPython.noop),
+    ]
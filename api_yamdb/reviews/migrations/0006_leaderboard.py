@@ -0,0 +1,67 @@
+# Generated by Django 3.2 on 2026-10-18 04:41
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+from reviews.consts import LEADERBOARD_PRIOR_SCORE, LEADERBOARD_PRIOR_WEIGHT
+
+
+def fill_leaderboard(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    LeaderboardEntry = apps.get_model('reviews', 'LeaderboardEntry')
+    entries = []
+    for title in Title.objects.filter(
+        review_count__gt=0
+    ).prefetch_related('genre'):
+        rating = (
+            (title.score_sum
+             + LEADERBOARD_PRIOR_WEIGHT * LEADERBOARD_PRIOR_SCORE)
+            / (title.review_count + LEADERBOARD_PRIOR_WEIGHT)
+        )
+        entries.extend(
+            LeaderboardEntry(
+                title_id=title.pk,
+                genre=genre,
+                category_id=title.category_id,
+                weighted_rating=rating,
+                review_count=title.review_count,
+            )
+            for genre in (None, *title.genre.all())
+        )
+    LeaderboardEntry.objects.bulk_create(entries, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_title_score_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('weighted_rating', models.FloatField(verbose_name='Взвешенный рейтинг')),
+                ('review_count', models.PositiveIntegerField(verbose_name='Количество отзывов')),
+                ('category', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='leaderboard_entries', to='reviews.category', verbose_name='Категория')),
+                ('genre', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entries', to='reviews.genre', verbose_name='Жанр')),
+                ('title', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entries', to='reviews.title', verbose_name='Произведение')),
+            ],
+            options={
+                'verbose_name': 'Строка рейтинга',
+                'verbose_name_plural': 'Рейтинг произведений',
+                'ordering': ('-weighted_rating', '-review_count', 'title'),
+                'default_related_name': 'leaderboard_entries',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='leaderboardentry',
+            index=models.Index(fields=['genre', '-weighted_rating', '-review_count', 'title'], name='leaderboard_genre_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leaderboardentry',
+            index=models.Index(fields=['genre', 'category', '-weighted_rating', '-review_count', 'title'], name='leaderboard_category_idx'),
+        ),
+        migrations.RunPython(fill_leaderboard, migrations.RunPython.noop),
+    ]
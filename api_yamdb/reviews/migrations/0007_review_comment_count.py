@@ -0,0 +1,28 @@
+# Generated by Django 3.2 on 2026-10-18 04:47
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_comment_counts(apps, schema_editor):
+    Review = apps.get_model('reviews', 'Review')
+    for review in Review.objects.annotate(
+        count=Count('comments')
+    ).filter(count__gt=0).iterator():
+        Review.objects.filter(pk=review.pk).update(comment_count=review.count)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_leaderboard'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='review',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество комментариев'),
+        ),
+        migrations.RunPython(fill_comment_counts, migrations.RunPython.noop),
+    ]
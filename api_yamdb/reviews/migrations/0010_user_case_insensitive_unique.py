@@ -0,0 +1,23 @@
+from django.db import migrations
+
+# Django 3.2 не поддерживает UniqueConstraint по выражениям,
+# поэтому уникальные индексы по LOWER(...) создаются напрямую.
+CASE_INSENSITIVE_INDEXES = (
+    ('user_email_ci_uniq', 'email'),
+    ('user_username_ci_uniq', 'username'),
+)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0009_outgoing_email'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            f'CREATE UNIQUE INDEX {name} ON reviews_user (LOWER({column}));',
+            f'DROP INDEX {name};',
+        )
+        for name, column in CASE_INSENSITIVE_INDEXES
+    ]
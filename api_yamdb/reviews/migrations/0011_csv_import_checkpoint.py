@@ -0,0 +1,29 @@
+# Generated by Django 3.2 on 2026-10-18 07:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0010_user_case_insensitive_unique'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CsvImportCheckpoint',
+            fields=[
+                ('file_name', models.CharField(max_length=256, primary_key=True, serialize=False, verbose_name='Файл')),
+                ('content_hash', models.CharField(max_length=64, verbose_name='Хэш содержимого')),
+                ('offset', models.PositiveBigIntegerField(default=0, verbose_name='Смещение, байт')),
+                ('line', models.PositiveIntegerField(default=0, verbose_name='Строка')),
+                ('rows_loaded', models.PositiveBigIntegerField(default=0, verbose_name='Загружено строк')),
+                ('completed', models.BooleanField(default=False, verbose_name='Загружен полностью')),
+                ('updated', models.DateTimeField(auto_now=True, verbose_name='Время изменения')),
+            ],
+            options={
+                'verbose_name': 'Контрольная точка загрузки',
+                'verbose_name_plural': 'Контрольные точки загрузки',
+            },
+        ),
+    ]
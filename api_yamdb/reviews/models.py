@@ -1,17 +1,49 @@
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
-from reviews.consts import MAX_LEN_ROLE, MAX_LEN_USERNAME, MAX_LEN_NAME
+from reviews.consts import (
+    MAX_LEN_EMAIL, MAX_LEN_NAME, MAX_LEN_ROLE, MAX_LEN_SCOPE,
+    MAX_LEN_USERNAME, MAX_SCORE, MIN_SCORE
+)
 from reviews.validators import (
     username_validator,
     validate_username_me, validate_year
 )
 
 
+class StoredCountersMixin:
+    """
+    Не даёт save() перезаписать счётчики устаревшими значениями.
+
+    Поля counter_fields меняются только атомарными UPDATE с F-выражениями,
+    поэтому при сохранении существующего объекта они (как и отложенные
+    поля) исключаются из update_fields.
+    """
+
+    counter_fields = ()
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            skipped = set(self.counter_fields) | self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in skipped
+                and field.attname not in skipped
+            ]
+        super().save(*args, **kwargs)
+
+
 class User(AbstractUser):
-    """Модель пользователя."""
+    """
+    Модель пользователя.
+
+    Почта и имя уникальны и без учёта регистра: индексы по LOWER(...)
+    создаются миграцией 0010_user_case_insensitive_unique.
+    """
 
     class UserRoles(models.TextChoices):
         USER = 'user', _('Пользователь')
@@ -85,9 +117,11 @@ class Genre(models.Model):
         return self.name
 
 
-class Title(models.Model):
+class Title(StoredCountersMixin, models.Model):
     """Модель произведения."""
 
+    counter_fields = ('rating', 'review_count', 'score_sum')
+
     name = models.CharField(max_length=MAX_LEN_NAME, verbose_name='Название')
     year = models.PositiveIntegerField(
         validators=(validate_year,),
@@ -107,6 +141,21 @@ class Title(models.Model):
         blank=True,
         verbose_name='Жанр'
     )
+    rating = models.FloatField(
+        'Рейтинг',
+        null=True,
+        editable=False,
+    )
+    review_count = models.PositiveIntegerField(
+        'Количество отзывов',
+        default=0,
+        editable=False,
+    )
+    score_sum = models.PositiveIntegerField(
+        'Сумма оценок',
+        default=0,
+        editable=False,
+    )
 
     class Meta:
         """Мета класс произведения."""
@@ -115,15 +164,109 @@ class Title(models.Model):
         default_related_name = 'titles'
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
+        indexes = [
+            models.Index(fields=['name', 'id'], name='title_name_idx')
+        ]
 
     def __str__(self):
         """Описание произведения."""
         return self.name
 
+    def get_rating_histogram(self):
+        """Распределение оценок произведения по всем баллам шкалы."""
+        counts = {
+            score_count.score: score_count.count
+            for score_count in self.score_counts.all()
+        }
+        return [
+            {'score': score, 'count': counts.get(score, 0)}
+            for score in range(MIN_SCORE, MAX_SCORE + 1)
+        ]
+
 
-class Review(models.Model):
+class TitleScoreCount(models.Model):
+    """Количество отзывов произведения с данной оценкой."""
+
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        verbose_name='Произведение',
+    )
+    score = models.SmallIntegerField('Оценка')
+    count = models.PositiveIntegerField('Количество отзывов', default=0)
+
+    class Meta:
+        default_related_name = 'score_counts'
+        verbose_name = 'Количество оценок'
+        verbose_name_plural = 'Гистограммы оценок'
+        constraints = [
+            models.UniqueConstraint(fields=['title', 'score'],
+                                    name='unique_title_score')
+        ]
+
+    def __str__(self):
+        return f'{self.title_id}: {self.score} x {self.count}'
+
+
+class LeaderboardEntry(models.Model):
+    """
+    Строка материализованного рейтинга произведений.
+
+    Для каждого произведения с отзывами хранится строка без жанра
+    (общий рейтинг и рейтинг по категории) и по строке на каждый его жанр,
+    поэтому любая выборка топа - проход по индексу.
+    """
+
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        verbose_name='Произведение',
+    )
+    genre = models.ForeignKey(
+        Genre,
+        on_delete=models.CASCADE,
+        null=True,
+        verbose_name='Жанр',
+    )
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.SET_NULL,
+        null=True,
+        verbose_name='Категория',
+    )
+    weighted_rating = models.FloatField('Взвешенный рейтинг')
+    review_count = models.PositiveIntegerField('Количество отзывов')
+
+    class Meta:
+        default_related_name = 'leaderboard_entries'
+        ordering = ('-weighted_rating', '-review_count', 'title')
+        verbose_name = 'Строка рейтинга'
+        verbose_name_plural = 'Рейтинг произведений'
+        indexes = [
+            models.Index(
+                fields=[
+                    'genre', '-weighted_rating', '-review_count', 'title'
+                ],
+                name='leaderboard_genre_idx'
+            ),
+            models.Index(
+                fields=[
+                    'genre', 'category',
+                    '-weighted_rating', '-review_count', 'title'
+                ],
+                name='leaderboard_category_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.title_id}: {self.weighted_rating:.2f}'
+
+
+class Review(StoredCountersMixin, models.Model):
     """Модель отзывов."""
 
+    counter_fields = ('comment_count',)
+
     title = models.ForeignKey(
         Title,
         on_delete=models.CASCADE,
@@ -138,11 +281,20 @@ class Review(models.Model):
     score = models.SmallIntegerField(
         'Рейтинг',
         validators=(
-            MaxValueValidator(10, message='Оценка не может быть выше 10'),
-            MinValueValidator(1, message='Оценка не может быть ниже 1')
+            MaxValueValidator(
+                MAX_SCORE, message=f'Оценка не может быть выше {MAX_SCORE}'
+            ),
+            MinValueValidator(
+                MIN_SCORE, message=f'Оценка не может быть ниже {MIN_SCORE}'
+            )
         )
     )
     pub_date = models.DateTimeField('Дата публикации', auto_now_add=True)
+    comment_count = models.PositiveIntegerField(
+        'Количество комментариев',
+        default=0,
+        editable=False,
+    )
 
     class Meta:
         default_related_name = 'reviews'
@@ -153,10 +305,36 @@ class Review(models.Model):
             models.UniqueConstraint(fields=['author', 'title_id'],
                                     name='unique_review')
         ]
+        indexes = [
+            models.Index(fields=['title', 'pub_date', 'id'],
+                         name='review_title_pub_date_idx')
+        ]
 
     def __str__(self):
         return f"Отзыв от {self.author} на {self.title}"
 
+    def save(self, *args, **kwargs):
+        """
+        Сохраняет отзыв вместе с пересчётом рейтинга произведения.
+
+        Прежняя оценка читается в той же транзакции с блокировкой строки
+        (где база её поддерживает), а не берётся из загруженного ранее
+        объекта: иначе два параллельных изменения оценки вычли бы одну и
+        ту же старую оценку и испортили сумму оценок и распределение.
+        """
+        update_fields = kwargs.get('update_fields')
+        self._loaded_score = None
+        with transaction.atomic():
+            if not self._state.adding and (
+                update_fields is None or 'score' in update_fields
+            ):
+                self._loaded_score = type(self)._base_manager.filter(
+                    pk=self.pk
+                ).select_for_update().values_list(
+                    'score', flat=True
+                ).first()
+            super().save(*args, **kwargs)
+
 
 class Comment(models.Model):
     """Модель комментариев."""
@@ -181,8 +359,129 @@ class Comment(models.Model):
     class Meta:
         default_related_name = 'comments'
         ordering = ('pub_date',)
+        indexes = [
+            models.Index(fields=['review', 'pub_date', 'id'],
+                         name='comment_review_pub_date_idx')
+        ]
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
 
     def __str__(self):
         return self.text
+
+
+class CatalogVersion(models.Model):
+    """
+    Версия раздела каталога.
+
+    Увеличивается при каждом изменении данных раздела и служит дешёвым
+    штампом для условных GET-запросов (ETag / Last-Modified).
+    """
+
+    class Scopes(models.TextChoices):
+        TITLES = 'titles', _('Произведения')
+        CATEGORIES = 'categories', _('Категории')
+        GENRES = 'genres', _('Жанры')
+    scope = models.CharField(
+        'Раздел',
+        primary_key=True,
+        choices=Scopes.choices,
+        max_length=MAX_LEN_SCOPE,
+    )
+    version = models.PositiveBigIntegerField('Версия', default=0)
+    modified = models.DateTimeField('Время изменения', auto_now=True)
+
+    class Meta:
+        verbose_name = 'Версия раздела каталога'
+        verbose_name_plural = 'Версии разделов каталога'
+
+    def __str__(self):
+        return f'{self.scope} v{self.version}'
+
+    @classmethod
+    def get_stamp(cls, scope):
+        """Возвращает пару (версия, время изменения) раздела."""
+        stamp = cls.objects.filter(scope=scope).values_list(
+            'version', 'modified'
+        ).first()
+        return stamp or (0, None)
+
+    @classmethod
+    def bump(cls, *scopes):
+        """Атомарно увеличивает версии разделов."""
+        now = timezone.now()
+        for scope in scopes:
+            versions = cls.objects.filter(scope=scope)
+            if versions.update(
+                version=models.F('version') + 1, modified=now
+            ):
+                continue
+            _, created = cls.objects.get_or_create(
+                scope=scope, defaults={'version': 1}
+            )
+            if not created:
+                versions.update(
+                    version=models.F('version') + 1, modified=now
+                )
+
+
+class OutgoingEmail(models.Model):
+    """
+    Письмо в очереди на отправку.
+
+    Запросы только добавляют письма в очередь, отправляет их фоновая
+    команда send_outbox_emails.
+    """
+
+    subject = models.CharField('Тема', max_length=MAX_LEN_NAME)
+    message = models.TextField('Текст')
+    from_email = models.EmailField('Отправитель', max_length=MAX_LEN_EMAIL)
+    recipient = models.EmailField('Получатель', max_length=MAX_LEN_EMAIL)
+    created = models.DateTimeField('Дата создания', auto_now_add=True)
+    sent_at = models.DateTimeField('Дата отправки', null=True, blank=True)
+    attempts = models.PositiveSmallIntegerField(
+        'Попыток отправки', default=0
+    )
+    last_error = models.TextField('Последняя ошибка', blank=True)
+
+    class Meta:
+        ordering = ('id',)
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+        indexes = [
+            models.Index(
+                fields=['id'],
+                condition=models.Q(sent_at__isnull=True),
+                name='outgoing_email_pending_idx'
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.subject} -> {self.recipient}'
+
+
+class CsvImportCheckpoint(models.Model):
+    """
+    Состояние загрузки CSV-файла командой add_db_csv.
+
+    Смещение и номер строки указывают на конец последней
+    зафиксированной пачки, хэш — на содержимое, к которому они
+    относятся.
+    """
+
+    file_name = models.CharField(
+        'Файл', max_length=MAX_LEN_NAME, primary_key=True
+    )
+    content_hash = models.CharField('Хэш содержимого', max_length=64)
+    offset = models.PositiveBigIntegerField('Смещение, байт', default=0)
+    line = models.PositiveIntegerField('Строка', default=0)
+    rows_loaded = models.PositiveBigIntegerField('Загружено строк', default=0)
+    completed = models.BooleanField('Загружен полностью', default=False)
+    updated = models.DateTimeField('Время изменения', auto_now=True)
+
+    class Meta:
+        verbose_name = 'Контрольная точка загрузки'
+        verbose_name_plural = 'Контрольные точки загрузки'
+
+    def __str__(self):
+        return f'{self.file_name}: {self.offset}'
@@ -0,0 +1,83 @@
+import re
+
+from django.db import connections
+from django.db.models import Q
+
+TITLE_FTS_TABLE = 'reviews_title_fts'
+
+CREATE_TITLE_FTS_SQL = (
+    f"""
+    CREATE VIRTUAL TABLE {TITLE_FTS_TABLE} USING fts5(
+        name, description,
+        content='reviews_title', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    f"""
+    CREATE TRIGGER {TITLE_FTS_TABLE}_ai AFTER INSERT ON reviews_title BEGIN
+        INSERT INTO {TITLE_FTS_TABLE}(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER {TITLE_FTS_TABLE}_ad AFTER DELETE ON reviews_title BEGIN
+        INSERT INTO {TITLE_FTS_TABLE}({TITLE_FTS_TABLE}, rowid, name,
+                                      description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER {TITLE_FTS_TABLE}_au
+    AFTER UPDATE OF name, description ON reviews_title BEGIN
+        INSERT INTO {TITLE_FTS_TABLE}({TITLE_FTS_TABLE}, rowid, name,
+                                      description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO {TITLE_FTS_TABLE}(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+    f"INSERT INTO {TITLE_FTS_TABLE}({TITLE_FTS_TABLE}) VALUES ('rebuild')",
+)
+
+DROP_TITLE_FTS_SQL = (
+    f'DROP TRIGGER IF EXISTS {TITLE_FTS_TABLE}_ai',
+    f'DROP TRIGGER IF EXISTS {TITLE_FTS_TABLE}_ad',
+    f'DROP TRIGGER IF EXISTS {TITLE_FTS_TABLE}_au',
+    f'DROP TABLE IF EXISTS {TITLE_FTS_TABLE}',
+)
+
+
+def build_match_query(text):
+    """
+    Превращает пользовательский ввод в безопасный запрос FTS5.
+
+    Каждое слово экранируется кавычками и ищется по префиксу,
+    поэтому спецсимволы синтаксиса FTS5 во вводе не приводят к ошибке.
+    """
+    return ' '.join(f'"{word}"*' for word in re.findall(r'\w+', text))
+
+
+def search_titles(queryset, text):
+    """
+    Отбирает произведения по названию и описанию, лучшие совпадения первыми.
+
+    На SQLite используется индекс FTS5, на остальных СУБД - поиск
+    подстроки.
+    """
+    match_query = build_match_query(text)
+    if not match_query:
+        return queryset.none()
+    if connections[queryset.db].vendor != 'sqlite':
+        return queryset.filter(
+            Q(name__icontains=text) | Q(description__icontains=text)
+        )
+    return queryset.extra(
+        tables=[TITLE_FTS_TABLE],
+        where=[
+            f'{TITLE_FTS_TABLE}.rowid = reviews_title.id',
+            f'{TITLE_FTS_TABLE} MATCH %s',
+        ],
+        params=[match_query],
+        select={'search_rank': f'{TITLE_FTS_TABLE}.rank'},
+        order_by=['search_rank'],
+    )
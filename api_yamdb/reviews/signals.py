@@ -0,0 +1,224 @@
+import threading
+from weakref import WeakValueDictionary
+
+from django.db.models import Case, F, FloatField, Value, When
+from django.db.models.functions import Cast
+from django.db.models.signals import (
+    m2m_changed, post_delete, post_save, pre_delete
+)
+from django.dispatch import receiver
+
+from reviews.derived import refresh_comment_counts, refresh_titles
+from reviews.leaderboard import refresh_leaderboard
+from reviews.models import (
+    CatalogVersion, Category, Comment, Genre, Review, Title, TitleScoreCount,
+    User
+)
+
+
+class DeletingObjects(threading.local):
+    """
+    Объекты, которые удаляются в текущем потоке, по первичным ключам.
+
+    Django отправляет pre_delete для всех собранных каскадом объектов до
+    первого DELETE, а post_delete дочерних объектов - раньше, чем
+    родительских. Поэтому обработчики отзывов и комментариев видят, что
+    их родитель тоже удаляется, и не обновляют строки, которые сейчас
+    исчезнут, а изменения от удаления пользователя копят и применяют
+    один раз. Ссылки слабые: если удаление прервалось исключением,
+    отметка пропадает вместе с объектом.
+    """
+
+    def __init__(self):
+        self.titles = WeakValueDictionary()
+        self.reviews = WeakValueDictionary()
+        self.users = WeakValueDictionary()
+
+
+deleting = DeletingObjects()
+
+
+def update_title_rating(title_id, count_delta, score_delta):
+    """
+    Атомарно изменяет счётчики отзывов произведения и пересчитывает рейтинг.
+
+    Все значения вычисляются в одном UPDATE через F-выражения,
+    поэтому параллельные запросы не затирают изменения друг друга.
+    """
+    review_count = F('review_count') + count_delta
+    score_sum = F('score_sum') + score_delta
+    Title.objects.filter(pk=title_id).update(
+        review_count=review_count,
+        score_sum=score_sum,
+        rating=Case(
+            When(review_count=-count_delta, then=Value(None)),
+            default=Cast(score_sum, FloatField()) / review_count,
+            output_field=FloatField(),
+        ),
+    )
+
+
+def update_score_histogram(title_id, score, delta):
+    """Атомарно изменяет количество отзывов с оценкой score."""
+    score_counts = TitleScoreCount.objects.filter(
+        title_id=title_id, score=score
+    )
+    if score_counts.update(count=F('count') + delta) or delta < 0:
+        return
+    _, created = TitleScoreCount.objects.get_or_create(
+        title_id=title_id, score=score, defaults={'count': delta}
+    )
+    if not created:
+        score_counts.update(count=F('count') + delta)
+
+
+@receiver(post_save, sender=Review)
+def review_saved(sender, instance, created, **kwargs):
+    """Учитывает новый отзыв или изменение оценки в рейтинге."""
+    score = int(instance.score)
+    if created:
+        update_title_rating(instance.title_id, 1, score)
+        update_score_histogram(instance.title_id, score, 1)
+        refresh_leaderboard(instance.title_id)
+    else:
+        loaded_score = getattr(instance, '_loaded_score', None)
+        if loaded_score is not None and loaded_score != score:
+            update_title_rating(instance.title_id, 0, score - loaded_score)
+            update_score_histogram(instance.title_id, loaded_score, -1)
+            update_score_histogram(instance.title_id, score, 1)
+            refresh_leaderboard(instance.title_id)
+    instance._loaded_score = score
+
+
+@receiver(pre_delete, sender=Title)
+def title_deleting(sender, instance, **kwargs):
+    deleting.titles[instance.pk] = instance
+
+
+@receiver(post_delete, sender=Title)
+def title_deleted(sender, instance, **kwargs):
+    deleting.titles.pop(instance.pk, None)
+
+
+@receiver(pre_delete, sender=Review)
+def review_deleting(sender, instance, **kwargs):
+    deleting.reviews[instance.pk] = instance
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted(sender, instance, **kwargs):
+    """
+    Исключает удалённый отзыв (в том числе каскадно) из рейтинга.
+
+    Отзывы удаляемого произведения пропускаются: его счётчики,
+    распределение оценок и строки рейтинга удаляются вместе с ним.
+    Произведения отзывов удаляемого автора пересчитываются один раз
+    после удаления автора.
+    """
+    deleting.reviews.pop(instance.pk, None)
+    if instance.title_id in deleting.titles:
+        return
+    author = deleting.users.get(instance.author_id)
+    if author is not None:
+        author._affected_title_ids.add(instance.title_id)
+        return
+    update_title_rating(instance.title_id, -1, -int(instance.score))
+    update_score_histogram(instance.title_id, int(instance.score), -1)
+    refresh_leaderboard(instance.title_id)
+    CatalogVersion.bump(CatalogVersion.Scopes.TITLES)
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, **kwargs):
+    """Увеличивает счётчик комментариев отзыва."""
+    if created:
+        Review.objects.filter(pk=instance.review_id).update(
+            comment_count=F('comment_count') + 1
+        )
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    """Уменьшает счётчик комментариев отзыва, если отзыв не удаляется."""
+    if instance.review_id in deleting.reviews:
+        return
+    author = deleting.users.get(instance.author_id)
+    if author is not None:
+        author._affected_review_ids.add(instance.review_id)
+        return
+    Review.objects.filter(pk=instance.review_id).update(
+        comment_count=F('comment_count') - 1
+    )
+
+
+@receiver(pre_delete, sender=User)
+def user_deleting(sender, instance, **kwargs):
+    instance._affected_title_ids = set()
+    instance._affected_review_ids = set()
+    deleting.users[instance.pk] = instance
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    """
+    Пересчитывает произведения и отзывы, затронутые удалением автора.
+
+    Каскад уже удалил его отзывы и комментарии, поэтому каждое
+    произведение пересчитывается по оставшимся отзывам один раз.
+    """
+    deleting.users.pop(instance.pk, None)
+    refresh_comment_counts(instance._affected_review_ids)
+    if instance._affected_title_ids:
+        refresh_titles(instance._affected_title_ids)
+        CatalogVersion.bump(CatalogVersion.Scopes.TITLES)
+
+
+@receiver(post_save, sender=Title)
+def title_saved(sender, instance, created, **kwargs):
+    """Переносит смену категории произведения в рейтинг."""
+    if not created:
+        refresh_leaderboard(instance.pk)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def title_genres_changed(sender, instance, action, reverse, pk_set,
+                         **kwargs):
+    """Переносит смену жанров произведения в рейтинг."""
+    if not reverse:
+        if action.startswith('post_'):
+            refresh_leaderboard(instance.pk)
+    elif action == 'pre_clear':
+        instance._cleared_title_ids = list(
+            instance.titles.values_list('pk', flat=True)
+        )
+    elif action == 'post_clear':
+        refresh_leaderboard(*instance._cleared_title_ids)
+    elif action.startswith('post_'):
+        refresh_leaderboard(*pk_set)
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_delete, sender=Title)
+@receiver(m2m_changed, sender=Title.genre.through)
+@receiver(post_save, sender=Review)
+def titles_changed(sender, **kwargs):
+    """Обновляет версию произведений при изменении их или отзывов."""
+    CatalogVersion.bump(CatalogVersion.Scopes.TITLES)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def categories_changed(sender, **kwargs):
+    """Категории вложены в произведения, поэтому меняются обе версии."""
+    CatalogVersion.bump(
+        CatalogVersion.Scopes.CATEGORIES, CatalogVersion.Scopes.TITLES
+    )
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+def genres_changed(sender, **kwargs):
+    """Жанры вложены в произведения, поэтому меняются обе версии."""
+    CatalogVersion.bump(
+        CatalogVersion.Scopes.GENRES, CatalogVersion.Scopes.TITLES
+    )
@@ -0,0 +1,10 @@
+import pytest
+
+from api.throttling import bucket_store
+
+
+@pytest.fixture(autouse=True)
+def clear_throttle_buckets():
+    bucket_store.clear()
+    yield
+    bucket_store.clear()
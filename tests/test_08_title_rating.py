@@ -0,0 +1,304 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.derived import rebuild_derived_data
+from reviews.leaderboard import rebuild_leaderboard
+from reviews.models import (
+    CatalogVersion, Comment, LeaderboardEntry, Review, Title, TitleScoreCount
+)
+from tests.utils import (
+    create_reviews, create_single_review, create_titles_bulk
+)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TitleRating:
+
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEW_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/'
+    )
+
+    def get_title(self, client, title_id):
+        response = client.get(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title_id)
+        )
+        assert response.status_code == HTTPStatus.OK
+        return response.json()
+
+    def test_01_rating_follows_review_writes(self, client, admin_client,
+                                             admin, user_client, user,
+                                             moderator_client, moderator):
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client
+        }
+        reviews, titles = create_reviews(admin_client, author_map)
+        title_id = titles[0]['id']
+        assert self.get_title(client, title_id)['rating'] == 5, (
+            'Проверьте, что рейтинг произведения обновляется при создании '
+            'отзыва.'
+        )
+
+        response = user_client.patch(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=reviews[1]['id']
+            ),
+            data={'score': 8}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert self.get_title(client, title_id)['rating'] == 6, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'изменении оценки отзыва.'
+        )
+
+        response = moderator_client.delete(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=reviews[1]['id']
+            )
+        )
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert self.get_title(client, title_id)['rating'] == 5, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'удалении отзыва.'
+        )
+
+        assert self.get_title(client, titles[1]['id'])['rating'] is None, (
+            'Проверьте, что у произведения без отзывов рейтинг равен `None`.'
+        )
+
+    def test_02_rating_after_cascade_delete(self, client, admin_client,
+                                            user_client, user):
+        _, titles = create_reviews(admin_client, {user: user_client})
+        title_id = titles[0]['id']
+        create_single_review(admin_client, title_id, 'Неплохо', 9)
+
+        user.delete()
+        title = Title.objects.get(pk=title_id)
+        assert (title.review_count, title.score_sum) == (1, 9), (
+            'Проверьте, что счётчики отзывов произведения обновляются при '
+            'каскадном удалении отзывов.'
+        )
+        assert self.get_title(client, title_id)['rating'] == 9
+
+    def test_03_rating_histogram(self, client, admin_client, admin,
+                                 user_client, user, moderator_client,
+                                 moderator):
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client
+        }
+        reviews, titles = create_reviews(admin_client, author_map)
+        title_id = titles[0]['id']
+        user_client.patch(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=reviews[1]['id']
+            ),
+            data={'score': 9}
+        )
+        moderator_client.delete(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=reviews[2]['id']
+            )
+        )
+        expected = [0] * 10
+        expected[5 - 1] = 1
+        expected[9 - 1] = 1
+
+        histogram_url = f'/api/v1/titles/{title_id}/rating-histogram/'
+        response = client.get(histogram_url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что эндпоинт `{histogram_url}` доступен '
+            'неавторизованному пользователю.'
+        )
+        assert [item['count'] for item in response.json()] == expected, (
+            'Проверьте, что распределение оценок обновляется при создании, '
+            'изменении и удалении отзывов.'
+        )
+        detail = client.get(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title_id),
+            {'histogram': 'true'}
+        ).json()
+        assert detail['rating_histogram'] == response.json()
+        assert 'rating_histogram' not in self.get_title(client, title_id)
+        assert client.get(
+            '/api/v1/titles/0/rating-histogram/'
+        ).status_code == HTTPStatus.NOT_FOUND
+
+    def test_04_top_titles(self, client, django_user_model):
+        classic, single, drama = create_titles_bulk(3)
+        drama.genre.set([])
+        authors = [
+            django_user_model.objects.create(
+                username=f'critic{idx}', email=f'critic{idx}@yamdb.fake'
+            )
+            for idx in range(8)
+        ]
+        for author in authors:
+            classic.reviews.create(
+                author=author, text='Классика', score=9
+            )
+        single.reviews.create(author=authors[0], text='Шедевр', score=10)
+        drama.reviews.create(author=authors[0], text='Неплохо', score=7)
+
+        response = client.get('/api/v1/titles/top/')
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что эндпоинт `/api/v1/titles/top/` доступен '
+            'неавторизованному пользователю.'
+        )
+        assert [title['id'] for title in response.json()] == [
+            classic.id, single.id, drama.id
+        ], (
+            'Проверьте, что рейтинг лучших учитывает количество отзывов: '
+            'много оценок 9 выше одной оценки 10.'
+        )
+        top = response.json()[0]
+        assert top['rating'] == 9
+        assert top['weighted_rating'] == pytest.approx((72 + 27.5) / 13)
+
+        genre_top = client.get('/api/v1/titles/top/', {'genre': 'horror'})
+        assert [title['id'] for title in genre_top.json()] == [
+            classic.id, single.id
+        ]
+        assert client.get(
+            '/api/v1/titles/top/', {'category': 'books'}
+        ).json() == []
+        assert len(client.get(
+            '/api/v1/titles/top/', {'limit': 1}
+        ).json()) == 1
+
+        entries = list(LeaderboardEntry.objects.values_list(
+            'title_id', 'genre_id', 'weighted_rating'
+        ).order_by('title_id', 'genre_id'))
+        rebuild_leaderboard()
+        assert entries == list(LeaderboardEntry.objects.values_list(
+            'title_id', 'genre_id', 'weighted_rating'
+        ).order_by('title_id', 'genre_id')), (
+            'Проверьте, что инкрементально обновлённый рейтинг совпадает '
+            'с полностью пересобранным.'
+        )
+
+    def create_authors(self, django_user_model, count):
+        return [
+            django_user_model.objects.create(
+                username=f'author{idx}', email=f'author{idx}@yamdb.fake'
+            )
+            for idx in range(count)
+        ]
+
+    def create_title_reviews(self, title, authors):
+        for idx, author in enumerate(authors):
+            review = Review.objects.create(
+                title=title, author=author, text='Отзыв', score=idx % 10 + 1
+            )
+            Comment.objects.create(review=review, author=author, text='Да')
+
+    def count_delete_queries(self, obj):
+        with CaptureQueriesContext(connection) as context:
+            obj.delete()
+        return len(context.captured_queries)
+
+    def test_05_title_delete_queries_constant(self, django_user_model):
+        authors = self.create_authors(django_user_model, 30)
+        small, large, kept = create_titles_bulk(3)
+        self.create_title_reviews(small, authors[:2])
+        self.create_title_reviews(large, authors)
+        self.create_title_reviews(kept, authors[:3])
+        version, _ = CatalogVersion.get_stamp(CatalogVersion.Scopes.TITLES)
+
+        query_counts = [
+            self.count_delete_queries(title) for title in (small, large)
+        ]
+        assert query_counts[0] == query_counts[1], (
+            'Проверьте, что количество запросов при удалении произведения '
+            'не зависит от количества его отзывов: счётчики, распределение '
+            'оценок и рейтинг удаляемого произведения не обновляются '
+            'для каждого отзыва.'
+        )
+        assert CatalogVersion.get_stamp(
+            CatalogVersion.Scopes.TITLES
+        )[0] == version + 2, (
+            'Проверьте, что удаление произведения меняет версию каталога '
+            'один раз, а не для каждого отзыва.'
+        )
+        assert not Review.objects.exclude(title=kept).exists()
+        assert not TitleScoreCount.objects.exclude(title=kept).exists()
+        assert not LeaderboardEntry.objects.exclude(title=kept).exists()
+        kept.refresh_from_db()
+        assert (kept.review_count, kept.score_sum) == (3, 6)
+
+    def derived_snapshot(self):
+        return (
+            list(Title.objects.order_by('pk').values_list(
+                'review_count', 'score_sum', 'rating'
+            )),
+            list(TitleScoreCount.objects.filter(count__gt=0).order_by(
+                'title_id', 'score'
+            ).values_list('title_id', 'score', 'count')),
+            list(LeaderboardEntry.objects.order_by(
+                'title_id', 'genre_id'
+            ).values_list('title_id', 'genre_id', 'weighted_rating')),
+            list(Review.objects.order_by('pk').values_list(
+                'pk', 'comment_count'
+            )),
+        )
+
+    def test_06_user_delete_refreshes_titles_once(self, django_user_model):
+        light, heavy, *others = self.create_authors(django_user_model, 4)
+        titles = create_titles_bulk(20)
+        for title in titles:
+            self.create_title_reviews(title, others)
+        self.create_title_reviews(titles[0], [light])
+        self.create_title_reviews(titles[1], [light])
+        for title in titles:
+            self.create_title_reviews(title, [heavy])
+        for review in Review.objects.filter(author__in=others):
+            Comment.objects.create(review=review, author=heavy, text='Нет')
+        Comment.objects.create(review=review, author=light, text='Нет')
+        version, _ = CatalogVersion.get_stamp(CatalogVersion.Scopes.TITLES)
+
+        query_counts = [
+            self.count_delete_queries(user) for user in (light, heavy)
+        ]
+        assert query_counts[0] == query_counts[1], (
+            'Проверьте, что количество запросов при удалении пользователя '
+            'не зависит от количества его отзывов и комментариев: '
+            'затронутые произведения пересчитываются один раз.'
+        )
+        assert CatalogVersion.get_stamp(
+            CatalogVersion.Scopes.TITLES
+        )[0] == version + 2
+        incremental = self.derived_snapshot()
+        rebuild_derived_data()
+        assert incremental == self.derived_snapshot(), (
+            'Проверьте, что после удаления пользователя счётчики, '
+            'распределение оценок, рейтинг и количество комментариев '
+            'совпадают с полностью пересчитанными.'
+        )
+
+    def test_07_concurrent_rescore(self, user):
+        title, = create_titles_bulk(1)
+        review = Review.objects.create(
+            title=title, author=user, text='Отзыв', score=5
+        )
+        first = Review.objects.get(pk=review.pk)
+        second = Review.objects.get(pk=review.pk)
+        first.score = 8
+        first.save()
+        second.score = 3
+        second.save()
+        title.refresh_from_db()
+        assert (title.review_count, title.score_sum, title.rating) == (
+            1, 3, 3
+        ), (
+            'Проверьте, что изменение оценки учитывает оценку, сохранённую '
+            'в базе, а не загруженную до параллельного изменения.'
+        )
+        incremental = self.derived_snapshot()
+        rebuild_derived_data()
+        assert incremental == self.derived_snapshot()
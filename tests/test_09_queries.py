@@ -0,0 +1,274 @@
+import json
+from base64 import b64encode
+from http import HTTPStatus
+
+import pytest
+from django.db import IntegrityError, connection
+from django.test.utils import CaptureQueriesContext
+
+from api.serializers import ReviewSerializer
+from reviews.models import Genre
+from tests.utils import create_titles_bulk
+
+
+def count_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    return len(context.captured_queries)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09Queries:
+
+    TITLES_URL = '/api/v1/titles/'
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+
+    def test_01_title_list_queries_constant(self, client):
+        create_titles_bulk(1)
+        small_page = count_queries(client, self.TITLES_URL)
+        create_titles_bulk(9, start=1)
+        full_page = count_queries(client, self.TITLES_URL)
+        assert small_page == full_page, (
+            f'Проверьте, что количество запросов к БД при GET-запросе к '
+            f'`{self.TITLES_URL}` не зависит от количества произведений '
+            f'на странице: {small_page} для 1 и {full_page} для 10.'
+        )
+
+    def test_02_title_detail_queries_constant(self, client):
+        title, = create_titles_bulk(1)
+        url = self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title.id)
+        few_genres = count_queries(client, url)
+        title.genre.add(*(
+            Genre.objects.create(name=f'Жанр {idx}', slug=f'genre-{idx}')
+            for idx in range(5)
+        ))
+        many_genres = count_queries(client, url)
+        assert few_genres == many_genres, (
+            'Проверьте, что количество запросов к БД при GET-запросе к '
+            f'`{self.TITLE_DETAIL_URL_TEMPLATE}` не зависит от количества '
+            'жанров произведения.'
+        )
+
+
+def count_parent_loads(context, table):
+    """Сколько раз за запрос родитель загружался по первичному ключу."""
+    pattern = f'FROM "{table}" WHERE '
+    return sum(
+        query['sql'].startswith('SELECT')
+        and pattern in query['sql']
+        and f'"{table}"."id" = ' in query['sql'].split(pattern)[1]
+        for query in context.captured_queries
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09NestedParentQueries:
+
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+
+    def check_parent_loaded_once(self, client, method, url, table,
+                                 expected_status, data=None):
+        with CaptureQueriesContext(connection) as context:
+            response = getattr(client, method)(url, data=data)
+        assert response.status_code == expected_status, (
+            f'{method.upper()}-запрос к `{url}` вернул '
+            f'{response.status_code}.'
+        )
+        loads = count_parent_loads(context, table)
+        assert loads == 1, (
+            f'Проверьте, что при {method.upper()}-запросе к `{url}` '
+            f'родительский объект загружается один раз, а не {loads}.'
+        )
+
+    def test_01_review_actions(self, user_client, moderator_client):
+        title, = create_titles_bulk(1)
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title.id)
+        self.check_parent_loaded_once(
+            user_client, 'post', url, 'reviews_title', HTTPStatus.CREATED,
+            {'text': 'Отзыв', 'score': 7}
+        )
+        review = title.reviews.get()
+        detail_url = f'{url}{review.id}/'
+        for method, expected_status, data in (
+            ('get', HTTPStatus.OK, None),
+            ('patch', HTTPStatus.OK, {'score': 8}),
+            ('delete', HTTPStatus.NO_CONTENT, None),
+        ):
+            self.check_parent_loaded_once(
+                user_client, method, detail_url, 'reviews_title',
+                expected_status, data
+            )
+        self.check_parent_loaded_once(
+            moderator_client, 'get', url, 'reviews_title', HTTPStatus.OK
+        )
+
+    def test_02_comment_actions(self, user, user_client):
+        title, = create_titles_bulk(1)
+        review = title.reviews.create(author=user, text='Отзыв', score=5)
+        url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=title.id, review_id=review.id
+        )
+        self.check_parent_loaded_once(
+            user_client, 'post', url, 'reviews_review', HTTPStatus.CREATED,
+            {'text': 'Комментарий'}
+        )
+        detail_url = f'{url}{review.comments.get().id}/'
+        for method, expected_status, data in (
+            ('get', HTTPStatus.OK, None),
+            ('patch', HTTPStatus.OK, {'text': 'Исправлено'}),
+            ('delete', HTTPStatus.NO_CONTENT, None),
+        ):
+            self.check_parent_loaded_once(
+                user_client, method, detail_url, 'reviews_review',
+                expected_status, data
+            )
+        self.check_parent_loaded_once(
+            user_client, 'get', url, 'reviews_review', HTTPStatus.OK
+        )
+
+    def test_03_review_uniqueness_by_constraint(self, user, user_client):
+        title, = create_titles_bulk(1)
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title.id)
+        title.reviews.create(author=user, text='Отзыв', score=5)
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(url, data={'text': 'Ещё', 'score': 6})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert 'non_field_errors' in response.json()
+        queries = [query['sql'] for query in context.captured_queries]
+        insert = next(
+            index for index, sql in enumerate(queries)
+            if sql.startswith('INSERT INTO "reviews_review"')
+        )
+        assert not any(
+            sql.startswith('SELECT') and 'FROM "reviews_review"' in sql
+            for sql in queries[:insert]
+        ), (
+            'Проверьте, что повторный отзыв отклоняется ограничением '
+            'базы данных без предварительного запроса к отзывам.'
+        )
+        title.refresh_from_db()
+        assert (title.review_count, title.score_sum) == (1, 5)
+
+    def test_04_listing_authors_batched(self, client, django_user_model):
+        title, = create_titles_bulk(1)
+        reviewed = None
+        query_counts = []
+        for start, count in ((0, 1), (1, 9)):
+            for idx in range(start, start + count):
+                author = django_user_model.objects.create(
+                    username=f'author{idx}', email=f'author{idx}@yamdb.fake'
+                )
+                review = title.reviews.create(
+                    author=author, text='Отзыв', score=5
+                )
+                reviewed = reviewed or review
+                reviewed.comments.create(author=author, text='Комментарий')
+            counts = [
+                count_queries(client, self.REVIEWS_URL_TEMPLATE.format(
+                    title_id=title.id
+                )),
+                count_queries(client, self.COMMENTS_URL_TEMPLATE.format(
+                    title_id=title.id, review_id=reviewed.id
+                )),
+            ]
+            query_counts.append(counts)
+        assert query_counts[0] == query_counts[1], (
+            'Проверьте, что авторы отзывов и комментариев загружаются '
+            'вместе со списком, а не отдельным запросом на каждую запись.'
+        )
+        response = client.get(
+            self.REVIEWS_URL_TEMPLATE.format(title_id=title.id)
+        )
+        assert {
+            review['author'] for review in response.json()['results']
+        } == {f'author{idx}' for idx in range(10)}
+
+    def test_05_review_comment_count(self, user, user_client, client):
+        title, = create_titles_bulk(1)
+        review = title.reviews.create(author=user, text='Отзыв', score=5)
+        comments_url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=title.id, review_id=review.id
+        )
+        for idx in range(3):
+            user_client.post(comments_url, data={'text': f'Комментарий {idx}'})
+        comment = review.comments.first()
+        user_client.delete(f'{comments_url}{comment.id}/')
+
+        reviews_url = self.REVIEWS_URL_TEMPLATE.format(title_id=title.id)
+        response = client.get(reviews_url)
+        assert response.json()['results'][0]['comment_count'] == 2, (
+            f'Проверьте, что ответ на GET-запрос к `{reviews_url}` содержит '
+            'актуальное количество комментариев `comment_count`.'
+        )
+
+        stale_review = type(review).objects.get(pk=review.pk)
+        review.comments.create(author=user, text='Ещё один')
+        stale_review.text = 'Исправленный отзыв'
+        stale_review.save()
+        review.refresh_from_db()
+        assert (review.text, review.comment_count) == (
+            'Исправленный отзыв', 3
+        ), 'Проверьте, что save() не перезаписывает счётчик комментариев.'
+
+    def explain_listing_queries(self, client, url, table):
+        plans = []
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        with connection.cursor() as cursor:
+            for query in context.captured_queries:
+                sql = query['sql']
+                if f'FROM "{table}"' in sql and 'ORDER BY' in sql:
+                    cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                    plans.append(
+                        ' | '.join(row[-1] for row in cursor.fetchall())
+                    )
+        assert plans, f'Не найден запрос списка к `{url}`.'
+        return plans
+
+    def make_cursor(self, obj, fields):
+        position = [
+            obj._meta.get_field(field).value_to_string(obj)
+            for field in fields
+        ]
+        return b64encode(json.dumps(position).encode()).decode()
+
+    @pytest.mark.parametrize('cursor', ('none', 'first', 'next'))
+    def test_06_listing_index_usage(self, client, user, cursor):
+        title, = create_titles_bulk(1)
+        review = title.reviews.create(author=user, text='Отзыв', score=5)
+        comment = review.comments.create(author=user, text='Комментарий')
+        for url, table, index, obj, fields in (
+            ('/api/v1/titles/', 'reviews_title', 'title_name_idx',
+             title, ('name', 'id')),
+            (self.REVIEWS_URL_TEMPLATE.format(title_id=title.id),
+             'reviews_review', 'review_title_pub_date_idx',
+             review, ('pub_date', 'id')),
+            (self.COMMENTS_URL_TEMPLATE.format(
+                title_id=title.id, review_id=review.id
+            ), 'reviews_comment', 'comment_review_pub_date_idx',
+             comment, ('pub_date', 'id')),
+        ):
+            query = {
+                'none': '',
+                'first': '?cursor=',
+                'next': f'?cursor={self.make_cursor(obj, fields)}',
+            }[cursor]
+            for plan in self.explain_listing_queries(
+                client, url + query, table
+            ):
+                assert index in plan and 'TEMP B-TREE' not in plan, (
+                    f'Проверьте, что список `{url}` читается по индексу '
+                    f'`{index}` без сортировки. План запроса: {plan}'
+                )
+
+    def test_07_review_other_integrity_errors(self, user):
+        title, = create_titles_bulk(1)
+        serializer = ReviewSerializer(data={'text': 'Отзыв', 'score': 5})
+        assert serializer.is_valid()
+        with pytest.raises(IntegrityError):
+            serializer.save(title=title, author_id=user.pk + 1000)
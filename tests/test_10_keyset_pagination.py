@@ -0,0 +1,73 @@
+from http import HTTPStatus
+
+import pytest
+
+from reviews.models import Review, Title
+from tests.utils import create_titles_bulk
+
+
+def collect_pages(client, url):
+    results = []
+    pages = 0
+    while url:
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert 'count' not in data, (
+            'Проверьте, что в keyset-режиме пагинации не выполняется '
+            'подсчёт общего количества объектов.'
+        )
+        results.extend(data['results'])
+        url = data['next']
+        pages += 1
+    return results, pages
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10KeysetPagination:
+
+    TITLES_URL = '/api/v1/titles/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+
+    def test_01_titles_keyset(self, client):
+        create_titles_bulk(12)
+        Title.objects.create(name='Произведение 005', year=2001)
+        results, pages = collect_pages(client, f'{self.TITLES_URL}?cursor=')
+        expected = list(
+            Title.objects.order_by('name', 'id').values_list('id', flat=True)
+        )
+        assert [title['id'] for title in results] == expected, (
+            f'Проверьте, что keyset-пагинация `{self.TITLES_URL}?cursor=` '
+            'возвращает все произведения по порядку `(name, id)` без '
+            'пропусков и повторов.'
+        )
+        assert pages == 2
+
+    def test_02_reviews_keyset(self, client, user):
+        title, = create_titles_bulk(1)
+        for idx in range(11):
+            reviewer = type(user).objects.create(
+                username=f'reviewer{idx}', email=f'reviewer{idx}@yamdb.fake'
+            )
+            Review.objects.create(
+                title=title, author=reviewer, text='text', score=5
+            )
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title.id)
+        results, pages = collect_pages(client, f'{url}?cursor=')
+        expected = list(
+            title.reviews.order_by('pub_date', 'id').values_list(
+                'id', flat=True
+            )
+        )
+        assert [review['id'] for review in results] == expected
+        assert pages == 2
+
+        response = client.get(url)
+        assert 'count' in response.json(), (
+            'Проверьте, что без параметра `cursor` сохраняется обычная '
+            'постраничная пагинация.'
+        )
+
+    def test_03_invalid_cursor(self, client):
+        response = client.get(f'{self.TITLES_URL}?cursor=broken')
+        assert response.status_code == HTTPStatus.NOT_FOUND
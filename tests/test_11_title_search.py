@@ -0,0 +1,56 @@
+from http import HTTPStatus
+
+import pytest
+
+from reviews.models import Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11TitleSearch:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def search(self, client, text):
+        response = client.get(self.TITLES_URL, {'search': text})
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{self.TITLES_URL}?search=` '
+            'возвращает ответ со статусом 200.'
+        )
+        return [title['name'] for title in response.json()['results']]
+
+    def test_01_search_ranked(self, client):
+        Title.objects.create(
+            name='Крестный отец', year=1972,
+            description='Сага о семье Корлеоне.'
+        )
+        Title.objects.create(
+            name='Крестный отец 2', year=1974,
+            description='Продолжение истории: крестный отец в молодости, '
+                        'крестный отец сейчас.'
+        )
+        Title.objects.create(name='Побег из Шоушенка', year=1994)
+
+        names = self.search(client, 'крестн')
+        assert set(names) == {'Крестный отец', 'Крестный отец 2'}, (
+            'Проверьте, что параметр `search` ищет произведения по началу '
+            'слов в названии и описании без учёта регистра.'
+        )
+        assert names[0] == 'Крестный отец 2', (
+            'Проверьте, что результаты поиска упорядочены по релевантности.'
+        )
+        assert self.search(client, 'корлеоне') == ['Крестный отец']
+        assert self.search(client, '"*') == []
+
+    def test_02_search_index_follows_writes(self, client):
+        title = Title.objects.create(name='Брат', year=1997)
+        assert self.search(client, 'брат') == ['Брат']
+
+        title.name = 'Брат 2'
+        title.save()
+        assert self.search(client, 'брат') == ['Брат 2']
+
+        title.delete()
+        assert self.search(client, 'брат') == [], (
+            'Проверьте, что удалённое произведение исчезает из '
+            'результатов поиска.'
+        )
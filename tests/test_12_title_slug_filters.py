@@ -0,0 +1,84 @@
+from http import HTTPStatus
+
+import pytest
+
+from reviews.models import Category, Genre, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12TitleSlugFilters:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    @pytest.fixture
+    def titles(self):
+        films = Category.objects.create(name='Фильм', slug='films')
+        books = Category.objects.create(name='Книга', slug='books')
+        genres = {
+            slug: Genre.objects.create(name=slug, slug=slug)
+            for slug in ('horror', 'horror-comedy', 'comedy', 'drama')
+        }
+        layout = (
+            ('Чужой', films, ('horror',)),
+            ('Зомбилэнд', films, ('horror-comedy', 'comedy')),
+            ('Маска', films, ('comedy', 'horror')),
+            ('Война и мир', books, ('drama',)),
+        )
+        for name, category, slugs in layout:
+            title = Title.objects.create(
+                name=name, year=2000, category=category
+            )
+            title.genre.set(genres[slug] for slug in slugs)
+
+    def names(self, client, params):
+        response = client.get(self.TITLES_URL, params)
+        assert response.status_code == HTTPStatus.OK
+        return sorted(title['name'] for title in response.json()['results'])
+
+    def test_01_genre_match_modes(self, client, titles):
+        assert self.names(client, {'genre': 'medy'}) == [
+            'Зомбилэнд', 'Маска'
+        ], (
+            'Проверьте, что по умолчанию слаг жанра ищется по подстроке, '
+            'как и раньше.'
+        )
+        assert self.names(
+            client, {'genre': 'horror', 'slug_match': 'exact'}
+        ) == ['Маска', 'Чужой']
+        assert self.names(
+            client, {'genre': 'horr', 'slug_match': 'prefix'}
+        ) == ['Зомбилэнд', 'Маска', 'Чужой']
+        assert self.names(
+            client, {'genre': 'medy', 'slug_match': 'contains'}
+        ) == ['Зомбилэнд', 'Маска']
+        response = client.get(self.TITLES_URL, {'slug_match': 'regex'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_02_several_genres(self, client, titles):
+        assert self.names(
+            client, {'genre': 'horror,drama', 'slug_match': 'exact'}
+        ) == ['Война и мир', 'Маска', 'Чужой'], (
+            'Проверьте, что несколько жанров через запятую по умолчанию '
+            'объединяются по ИЛИ.'
+        )
+        assert self.names(client, {
+            'genre': 'horror,comedy', 'genre_mode': 'all',
+            'slug_match': 'exact'
+        }) == ['Маска'], (
+            'Проверьте, что при `genre_mode=all` возвращаются произведения '
+            'со всеми указанными жанрами.'
+        )
+
+    def test_03_category_match_modes(self, client, titles):
+        assert self.names(client, {'category': 'ook'}) == [
+            'Война и мир'
+        ], (
+            'Проверьте, что по умолчанию слаг категории ищется по '
+            'подстроке, как и раньше.'
+        )
+        assert self.names(
+            client, {'category': 'book', 'slug_match': 'exact'}
+        ) == []
+        assert self.names(
+            client, {'category': 'book', 'slug_match': 'prefix'}
+        ) == ['Война и мир']
@@ -0,0 +1,71 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Genre, Review
+from tests.utils import create_titles_bulk
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13ConditionalGet:
+
+    TITLES_URL = '/api/v1/titles/'
+    GENRES_URL = '/api/v1/genres/'
+
+    def test_01_not_modified_without_list_query(self, client):
+        create_titles_bulk(3)
+        response = client.get(self.TITLES_URL)
+        assert response.status_code == HTTPStatus.OK
+        etag = response['ETag']
+        assert etag and response.has_header('Last-Modified'), (
+            f'Проверьте, что ответ на GET-запрос к `{self.TITLES_URL}` '
+            'содержит заголовки `ETag` и `Last-Modified`.'
+        )
+
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(self.TITLES_URL, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что при совпадении `If-None-Match` возвращается '
+            'ответ со статусом 304.'
+        )
+        assert len(context.captured_queries) == 1, (
+            'Проверьте, что ответ 304 строится по версии каталога без '
+            'запроса списка произведений.'
+        )
+
+    def test_02_writes_change_etag(self, client, user):
+        title, = create_titles_bulk(1)
+        titles_etag = client.get(self.TITLES_URL)['ETag']
+        genres_etag = client.get(self.GENRES_URL)['ETag']
+
+        Review.objects.create(title=title, author=user, text='ok', score=7)
+        response = client.get(self.TITLES_URL, HTTP_IF_NONE_MATCH=titles_etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что новый отзыв меняет версию списка произведений.'
+        )
+        titles_etag = response['ETag']
+
+        Genre.objects.filter(slug='horror').get().delete()
+        for url, etag in (
+            (self.TITLES_URL, titles_etag), (self.GENRES_URL, genres_etag)
+        ):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == HTTPStatus.OK, (
+                f'Проверьте, что удаление жанра меняет версию `{url}`.'
+            )
+
+    def test_03_missing_title_not_modified(self, client):
+        title, = create_titles_bulk(1)
+        url = f'{self.TITLES_URL}{title.id}/'
+        etag = client.get(url)['ETag']
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+        for missing_url in (f'{self.TITLES_URL}99999/',
+                            f'{self.TITLES_URL}abc/'):
+            response = client.get(missing_url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == HTTPStatus.NOT_FOUND, (
+                'Проверьте, что условный запрос к несуществующему '
+                'произведению получает ответ 404, а не 304.'
+            )
@@ -0,0 +1,64 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import cache
+
+from reviews.models import Review
+from tests.utils import create_titles_bulk
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14ResponseCache:
+
+    TITLES_URL = '/api/v1/titles/'
+    CACHE_STATS_URL = '/api/v1/titles/cache-stats/'
+
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        cache.clear()
+
+    def test_01_hits_and_invalidation(self, client, user):
+        title, = create_titles_bulk(1)
+        detail_url = f'{self.TITLES_URL}{title.id}/'
+
+        assert client.get(detail_url)['X-Cache'] == 'MISS'
+        response = client.get(detail_url)
+        assert response['X-Cache'] == 'HIT', (
+            'Проверьте, что повторный GET-запрос к произведению отдаётся '
+            'из кэша.'
+        )
+        assert response.json()['rating'] is None
+
+        Review.objects.create(title=title, author=user, text='ok', score=8)
+        response = client.get(detail_url)
+        assert response['X-Cache'] == 'MISS', (
+            'Проверьте, что новый отзыв делает кэш произведения '
+            'неактуальным.'
+        )
+        assert response.json()['rating'] == 8
+
+    def test_02_params_normalized(self, client):
+        create_titles_bulk(2)
+        client.get(self.TITLES_URL, {'year': 2000, 'genre': 'horror'})
+        response = client.get(
+            f'{self.TITLES_URL}?genre=horror&year=2000'
+        )
+        assert response['X-Cache'] == 'HIT', (
+            'Проверьте, что порядок параметров запроса не влияет на ключ '
+            'кэша.'
+        )
+        response = client.get(self.TITLES_URL, {'genre': 'comedy'})
+        assert response['X-Cache'] == 'MISS'
+
+    def test_03_cache_stats(self, client, admin_client, user_client):
+        create_titles_bulk(1)
+        for _ in range(3):
+            client.get(self.TITLES_URL)
+        assert user_client.get(
+            self.CACHE_STATS_URL
+        ).status_code == HTTPStatus.FORBIDDEN
+        response = admin_client.get(self.CACHE_STATS_URL)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == {
+            'hits': 2, 'misses': 1, 'hit_ratio': 2 / 3
+        }
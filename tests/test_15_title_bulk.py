@@ -0,0 +1,124 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Title
+from tests.utils import create_titles_bulk
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15TitleBulk:
+
+    BULK_URL = '/api/v1/titles/bulk/'
+
+    def make_items(self, count, start=0):
+        return [
+            {
+                'name': f'Пакетное {idx}',
+                'year': 2001,
+                'category': 'films',
+                'genre': ['horror', 'comedy'],
+            }
+            for idx in range(start, start + count)
+        ]
+
+    def test_01_bulk_create_with_errors(self, admin_client):
+        existing, = create_titles_bulk(1)
+        items = self.make_items(3)
+        items[1]['genre'] = ['horror', 'unknown']
+        items.append({'name': 'Без года', 'category': 'films', 'genre': []})
+        items.append({
+            'id': existing.id, 'name': 'Переименовано', 'year': 1999,
+            'category': 'films', 'genre': ['comedy'],
+        })
+        response = admin_client.post(self.BULK_URL, items, format='json')
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert (data['created'], data['updated'], data['errors']) == (
+            2, 1, 2
+        ), (
+            'Проверьте, что ошибочные элементы пакета не мешают сохранить '
+            'остальные.'
+        )
+        statuses = [result['status'] for result in data['results']]
+        assert statuses == [
+            'created', 'error', 'created', 'error', 'updated'
+        ]
+        assert 'genre' in data['results'][1]['errors']
+        assert 'year' in data['results'][3]['errors']
+
+        created = Title.objects.get(pk=data['results'][2]['id'])
+        assert created.name == 'Пакетное 2'
+        assert set(created.genre.values_list('slug', flat=True)) == {
+            'horror', 'comedy'
+        }
+        existing.refresh_from_db()
+        assert existing.name == 'Переименовано'
+        assert list(existing.genre.values_list('slug', flat=True)) == [
+            'comedy'
+        ]
+
+    def test_02_bulk_queries_constant(self, admin_client):
+        create_titles_bulk(1)
+        query_counts = []
+        for count, start in ((2, 0), (20, 2)):
+            with CaptureQueriesContext(connection) as context:
+                response = admin_client.post(
+                    self.BULK_URL, self.make_items(count, start),
+                    format='json'
+                )
+            assert response.json()['created'] == count
+            query_counts.append(len(context.captured_queries))
+        assert query_counts[0] == query_counts[1], (
+            'Проверьте, что количество запросов к БД при пакетной загрузке '
+            'не зависит от размера пакета.'
+        )
+        assert Title.objects.count() == 23
+
+    def test_03_bulk_permissions(self, user_client):
+        response = user_client.post(
+            self.BULK_URL, self.make_items(1), format='json'
+        )
+        assert response.status_code == HTTPStatus.FORBIDDEN
+
+    def test_04_bulk_repeated_id(self, admin_client):
+        existing, = create_titles_bulk(1)
+        items = self.make_items(1)
+        for name in ('Первое', 'Второе'):
+            items.append({
+                'id': existing.id, 'name': name, 'year': 1999,
+                'category': 'films', 'genre': ['comedy'],
+            })
+        response = admin_client.post(self.BULK_URL, items, format='json')
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что повтор id в пакете не приводит к ошибке сервера.'
+        )
+        data = response.json()
+        assert (data['created'], data['updated'], data['errors']) == (
+            1, 0, 2
+        ), (
+            'Проверьте, что элементы с повторяющимся id возвращаются '
+            'как ошибки, а остальные элементы пакета сохраняются.'
+        )
+        assert all(
+            'id' in result['errors']
+            for result in data['results'] if result['status'] == 'error'
+        )
+        existing.refresh_from_db()
+        assert existing.name == 'Произведение 000'
+
+    def test_05_bulk_update_keeps_description(self, admin_client):
+        existing, = create_titles_bulk(1)
+        Title.objects.filter(pk=existing.pk).update(description='Описание')
+        response = admin_client.post(self.BULK_URL, [{
+            'id': existing.id, 'name': 'Переименовано', 'year': 1999,
+            'category': 'films', 'genre': ['comedy'],
+        }], format='json')
+        assert response.json()['updated'] == 1
+        existing.refresh_from_db()
+        assert existing.description == 'Описание', (
+            'Проверьте, что обновление без поля `description` не стирает '
+            'описание произведения.'
+        )
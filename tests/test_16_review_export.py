@@ -0,0 +1,43 @@
+import json
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_reviews
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16ReviewExport:
+
+    EXPORT_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/export/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+
+    def test_01_export_ndjson(self, client, admin_client, admin, user,
+                              user_client, moderator, moderator_client):
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client
+        }
+        _, titles = create_reviews(admin_client, author_map)
+        url = self.EXPORT_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что эндпоинт `{url}` доступен неавторизованному '
+            'пользователю.'
+        )
+        assert response.streaming
+        assert response['Content-Type'].startswith('application/x-ndjson')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        exported = [json.loads(line) for line in lines]
+
+        listed = client.get(
+            self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        ).json()['results']
+        assert exported == listed, (
+            'Проверьте, что выгрузка отзывов содержит те же данные, что '
+            'и список отзывов произведения.'
+        )
+        assert client.get(
+            self.EXPORT_URL_TEMPLATE.format(title_id=0)
+        ).status_code == HTTPStatus.NOT_FOUND
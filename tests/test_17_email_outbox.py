@@ -0,0 +1,96 @@
+from http import HTTPStatus
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import CommandError, call_command
+
+from reviews.management.commands import send_outbox_emails
+from reviews.models import OutgoingEmail
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17EmailOutbox:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+
+    def test_01_signup_queues_email(self, client):
+        outbox_before_count = len(mail.outbox)
+        for idx in range(3):
+            response = client.post(self.URL_SIGNUP, data={
+                'email': f'queued{idx}@yamdb.fake',
+                'username': f'queued{idx}'
+            })
+            assert response.status_code == HTTPStatus.OK
+        assert len(mail.outbox) == outbox_before_count, (
+            'Проверьте, что при регистрации письмо ставится в очередь, '
+            'а не отправляется во время запроса.'
+        )
+        assert OutgoingEmail.objects.filter(sent_at__isnull=True).count() == 3
+
+        call_command('send_outbox_emails', batch_size=2)
+        assert len(mail.outbox) == outbox_before_count + 3
+        assert not OutgoingEmail.objects.filter(
+            sent_at__isnull=True
+        ).exists(), 'Проверьте, что отправленные письма отмечаются в очереди.'
+
+        call_command('send_outbox_emails')
+        assert len(mail.outbox) == outbox_before_count + 3, (
+            'Проверьте, что письма не отправляются повторно.'
+        )
+
+    def test_02_idle_pass_skips_connection(self, client, monkeypatch):
+        opened = []
+
+        def get_connection(*args, **kwargs):
+            opened.append(True)
+            return mail.get_connection(*args, **kwargs)
+
+        monkeypatch.setattr(
+            send_outbox_emails, 'get_connection', get_connection
+        )
+        call_command('send_outbox_emails')
+        assert not opened, (
+            'Проверьте, что при пустой очереди соединение с почтовым '
+            'сервером не открывается.'
+        )
+        client.post(self.URL_SIGNUP, data={
+            'email': 'idle@yamdb.fake', 'username': 'idle'
+        })
+        call_command('send_outbox_emails')
+        assert len(opened) == 1
+
+    def test_03_server_outage_keeps_loop(self, client, monkeypatch):
+        class DownBackend(EmailBackend):
+            def open(self):
+                raise ConnectionRefusedError('сервер недоступен')
+
+        class StopLoop(Exception):
+            pass
+
+        sleeps = []
+
+        def sleep(seconds):
+            sleeps.append(seconds)
+            if len(sleeps) == 2:
+                raise StopLoop
+
+        monkeypatch.setattr(
+            send_outbox_emails, 'get_connection', lambda: DownBackend()
+        )
+        monkeypatch.setattr(send_outbox_emails.time, 'sleep', sleep)
+        client.post(self.URL_SIGNUP, data={
+            'email': 'down@yamdb.fake', 'username': 'down'
+        })
+        with pytest.raises(CommandError):
+            call_command('send_outbox_emails')
+        with pytest.raises(StopLoop):
+            call_command('send_outbox_emails', loop=True, interval=7)
+        assert sleeps == [7, 7], (
+            'Проверьте, что в режиме `--loop` недоступность почтового '
+            'сервера не завершает команду, а повторяется через --interval.'
+        )
+        email = OutgoingEmail.objects.get()
+        assert email.sent_at is None
+        assert email.attempts == 0
+        assert 'сервер недоступен' in email.last_error
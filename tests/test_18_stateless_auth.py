@@ -0,0 +1,128 @@
+from http import HTTPStatus
+
+import pytest
+from django.contrib.auth.tokens import default_token_generator
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.authentication import RoleRefreshToken
+from tests.utils import create_titles_bulk
+
+
+def role_client(user):
+    client = APIClient()
+    token = RoleRefreshToken.for_user(user).access_token
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    return client
+
+
+def user_queries(context):
+    return [
+        query['sql'] for query in context.captured_queries
+        if 'FROM "reviews_user"' in query['sql']
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18StatelessAuth:
+
+    USERS_URL = '/api/v1/users/'
+    USERS_ME_URL = '/api/v1/users/me/'
+    TOKEN_URL = '/api/v1/auth/token/'
+
+    def test_01_token_has_role_claims(self, client, admin):
+        response = client.post(self.TOKEN_URL, data={
+            'username': admin.username,
+            'confirmation_code': default_token_generator.make_token(admin),
+        })
+        assert response.status_code == HTTPStatus.OK
+        token = AccessToken(response.json()['token'])
+        assert token['role'] == admin.role, (
+            f'Проверьте, что токен от `{self.TOKEN_URL}` содержит роль '
+            'пользователя.'
+        )
+        assert token['username'] == admin.username
+        assert token['is_superuser'] is False
+
+    def test_02_permissions_without_user_query(self, admin):
+        client = role_client(admin)
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(self.USERS_URL)
+        assert response.status_code == HTTPStatus.OK
+        loads = [
+            sql for sql in user_queries(context) if 'COUNT(' not in sql
+        ]
+        assert len(loads) == 1, (
+            'Проверьте, что при аутентификации по токену с ролью '
+            'пользователь не загружается из БД: ожидался только запрос '
+            f'списка пользователей, получено {loads}.'
+        )
+
+    def test_03_role_from_token_is_checked(self, user, moderator):
+        response = role_client(user).get(self.USERS_URL)
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            'Проверьте, что роль `user` из токена не даёт доступа '
+            f'к `{self.USERS_URL}`.'
+        )
+        title, = create_titles_bulk(1)
+        reviews_url = f'/api/v1/titles/{title.id}/reviews/'
+        response = role_client(user).post(
+            reviews_url, data={'text': 'Отзыв', 'score': 5}
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        assert response.json()['author'] == user.username
+        review_url = f'{reviews_url}{response.json()["id"]}/'
+        response = role_client(user).patch(review_url, data={'text': 'Ок'})
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что автор, аутентифицированный по токену с ролью, '
+            'может изменить свой отзыв.'
+        )
+        response = role_client(moderator).delete(review_url)
+        assert response.status_code == HTTPStatus.NO_CONTENT
+
+    def test_04_me_loads_full_user(self, user):
+        response = role_client(user).get(self.USERS_ME_URL)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['email'] == user.email, (
+            f'Проверьте, что `{self.USERS_ME_URL}` возвращает полные данные '
+            'пользователя при аутентификации по токену с ролью.'
+        )
+        response = role_client(user).patch(
+            self.USERS_ME_URL, data={'bio': 'Новое описание'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        user.refresh_from_db()
+        assert user.bio == 'Новое описание'
+
+    def test_05_deleted_user_me_unauthorized(self, user):
+        client = role_client(user)
+        user.delete()
+        response = client.get(self.USERS_ME_URL)
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+    @pytest.mark.parametrize('deactivate', ('delete', 'deactivate'))
+    def test_06_removed_user_cannot_write(self, user, moderator, deactivate):
+        title, = create_titles_bulk(1)
+        reviews_url = f'/api/v1/titles/{title.id}/reviews/'
+        response = role_client(moderator).post(
+            reviews_url, data={'text': 'Отзыв', 'score': 5}
+        )
+        comments_url = f'{reviews_url}{response.json()["id"]}/comments/'
+        client = role_client(user)
+        if deactivate == 'delete':
+            user.delete()
+        else:
+            user.is_active = False
+            user.save()
+        for url, data in (
+            (reviews_url, {'text': 'Отзыв', 'score': 5}),
+            (comments_url, {'text': 'Комментарий'}),
+        ):
+            response = client.post(url, data=data)
+            assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+                'Проверьте, что токен удалённого или неактивного '
+                f'пользователя не даёт права записи в `{url}`.'
+            )
+        assert client.get(reviews_url).status_code == HTTPStatus.OK
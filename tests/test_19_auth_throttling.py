@@ -0,0 +1,136 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.throttling import (
+    AuthIPThrottle, AuthUsernameThrottle, CacheBucketStore, LocalBucketStore
+)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19AuthThrottling:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+    URL_TOKEN = '/api/v1/auth/token/'
+
+    def exhaust(self, client, url, throttle, make_data):
+        limit = throttle().num_requests
+        for idx in range(limit):
+            response = client.post(url, data=make_data(idx))
+            assert response.status_code != HTTPStatus.TOO_MANY_REQUESTS, (
+                f'Проверьте, что первые {limit} запросов к `{url}` '
+                'не ограничиваются.'
+            )
+
+    def test_01_username_bucket(self, client):
+        data = {'username': 'bot', 'confirmation_code': 'wrong'}
+        self.exhaust(
+            client, self.URL_TOKEN, AuthUsernameThrottle, lambda idx: data
+        )
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(self.URL_TOKEN, data={
+                'username': 'BOT', 'confirmation_code': 'wrong'
+            })
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            f'Проверьте, что частые запросы к `{self.URL_TOKEN}` с одним '
+            'именем пользователя ограничиваются без учёта регистра.'
+        )
+        assert 'Retry-After' in response
+        assert not context.captured_queries, (
+            'Проверьте, что ограниченный запрос отклоняется без обращения '
+            'к базе данных.'
+        )
+        response = client.post(self.URL_TOKEN, data={
+            'username': 'other', 'confirmation_code': 'wrong'
+        })
+        assert response.status_code != HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что корзина имени пользователя не влияет на '
+            'запросы с другим именем.'
+        )
+
+    def test_02_ip_bucket(self, client):
+        self.exhaust(
+            client, self.URL_SIGNUP, AuthIPThrottle,
+            lambda idx: {'username': f'user{idx}'}
+        )
+        response = client.post(
+            self.URL_SIGNUP, data={'username': 'fresh'}
+        )
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            f'Проверьте, что частые запросы к `{self.URL_SIGNUP}` с одного '
+            'IP-адреса ограничиваются.'
+        )
+        response = client.post(
+            self.URL_SIGNUP, data={'username': 'fresh'},
+            REMOTE_ADDR='10.0.0.2'
+        )
+        assert response.status_code != HTTPStatus.TOO_MANY_REQUESTS
+
+    def test_03_bucket_refills(self, client, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr(AuthUsernameThrottle, 'timer', lambda self: now[0])
+        throttle = AuthUsernameThrottle()
+        data = {'username': 'slow', 'confirmation_code': 'wrong'}
+        self.exhaust(
+            client, self.URL_TOKEN, AuthUsernameThrottle, lambda idx: data
+        )
+        response = client.post(self.URL_TOKEN, data=data)
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+        now[0] += throttle.duration / throttle.num_requests
+        response = client.post(self.URL_TOKEN, data=data)
+        assert response.status_code != HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что корзина пополняется со временем.'
+        )
+
+    def test_04_forwarded_for_ignored(self, client):
+        limit = AuthIPThrottle().num_requests
+        statuses = [
+            client.post(
+                self.URL_TOKEN,
+                data={'username': f'user{idx}', 'confirmation_code': 'wrong'},
+                HTTP_X_FORWARDED_FOR=f'198.51.100.{idx}'
+            ).status_code
+            for idx in range(limit + 1)
+        ]
+        assert statuses[-1] == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что корзина IP-адреса не сбрасывается подменой '
+            'заголовка `X-Forwarded-For`.'
+        )
+
+    def test_05_non_object_body(self, client):
+        for url in (self.URL_SIGNUP, self.URL_TOKEN):
+            response = client.post(
+                url, data=['username'], content_type='application/json'
+            )
+            assert response.status_code == HTTPStatus.BAD_REQUEST, (
+                f'Проверьте, что `{url}` отвечает 400 на тело запроса, '
+                'которое не является объектом JSON.'
+            )
+
+
+class Test19BucketStores:
+
+    def test_01_local_store_bounded(self, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr('api.throttling.time.monotonic', lambda: now[0])
+        store = LocalBucketStore(max_keys=3)
+        for idx in range(10):
+            store.set(f'bot{idx}', (1, now[0]), 60)
+        assert len(store.buckets) == 3, (
+            'Проверьте, что число корзин в памяти процесса ограничено.'
+        )
+        assert store.get('bot0') is None
+        assert store.get('bot9') == (1, now[0])
+        now[0] += 60
+        assert store.get('bot9') is None, (
+            'Проверьте, что корзина удаляется по истечении timeout.'
+        )
+        assert len(store.buckets) == 2
+
+    def test_02_cache_store_clear(self):
+        store = CacheBucketStore('default')
+        store.set('bot', (1, 0), 60)
+        store.clear()
+        assert store.get('bot') is None
@@ -0,0 +1,76 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import IntegrityError, connection
+from django.test.utils import CaptureQueriesContext
+
+
+def user_selects(context):
+    return [
+        query['sql'] for query in context.captured_queries
+        if query['sql'].startswith('SELECT')
+        and 'FROM "reviews_user"' in query['sql']
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20SignupLookup:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+    URL_ADMIN_CREATE_USER = '/api/v1/users/'
+
+    def test_01_existing_user_single_query(self, client, user):
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(self.URL_SIGNUP, data={
+                'username': user.username, 'email': user.email
+            })
+        assert response.status_code == HTTPStatus.OK
+        selects = user_selects(context)
+        assert len(selects) == 1, (
+            f'Проверьте, что POST-запрос к `{self.URL_SIGNUP}` для '
+            'существующего пользователя проверяет имя и почту одним '
+            f'запросом, получено: {selects}.'
+        )
+        assert 'LIMIT 2' in selects[0]
+
+    @pytest.mark.parametrize('data', (
+        {'username': 'testuser', 'email': 'new@yamdb.fake'},
+        {'username': 'NewUser', 'email': 'TestUser@YaMDb.fake'},
+    ))
+    def test_02_signup_case_insensitive_conflict(self, client, user, data):
+        response = client.post(self.URL_SIGNUP, data=data)
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            f'Проверьте, что POST-запрос к `{self.URL_SIGNUP}` с именем или '
+            'почтой, отличающимися от занятых только регистром, '
+            'возвращает ответ со статусом 400.'
+        )
+
+    def test_03_admin_create_case_insensitive_conflict(self, admin_client,
+                                                       user):
+        response = admin_client.post(self.URL_ADMIN_CREATE_USER, data={
+            'username': 'TESTUSER', 'email': 'other@yamdb.fake'
+        })
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        response = admin_client.post(self.URL_ADMIN_CREATE_USER, data={
+            'username': 'other', 'email': 'TESTUSER@yamdb.fake'
+        })
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_04_database_rejects_case_duplicates(self, django_user_model,
+                                                 user):
+        with pytest.raises(IntegrityError):
+            django_user_model.objects.create(
+                username='TestUSER', email='unique@yamdb.fake'
+            )
+
+    def test_05_lookup_uses_indexes(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'EXPLAIN QUERY PLAN SELECT id FROM reviews_user '
+                'WHERE LOWER(email) = LOWER(%s) '
+                'OR LOWER(username) = LOWER(%s)',
+                ('a@yamdb.fake', 'a')
+            )
+            plan = ' '.join(row[-1] for row in cursor.fetchall())
+        assert 'user_email_ci_uniq' in plan
+        assert 'user_username_ci_uniq' in plan
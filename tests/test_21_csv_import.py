@@ -0,0 +1,77 @@
+import csv
+import shutil
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db.models import Avg
+
+from reviews.management.commands.add_db_csv import (
+    DATA_SOURCES_FOR_MOVIE_DATABASE, DEFAULT_DATA_DIR
+)
+from reviews.models import (
+    CatalogVersion, Comment, LeaderboardEntry, Review, Title, TitleScoreCount
+)
+
+
+def read_rows(data_dir, model):
+    with open(
+        data_dir / DATA_SOURCES_FOR_MOVIE_DATABASE[model], encoding='utf-8'
+    ) as file:
+        return list(csv.DictReader(file))
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21CsvImport:
+
+    def test_01_loads_all_files(self):
+        call_command('add_db_csv', batch_size=10)
+        for model in DATA_SOURCES_FOR_MOVIE_DATABASE:
+            expected = len(read_rows(DEFAULT_DATA_DIR, model))
+            assert model.objects.count() == expected, (
+                f'Проверьте, что `add_db_csv` загружает все строки '
+                f'{DATA_SOURCES_FOR_MOVIE_DATABASE[model]}.'
+            )
+
+    def test_02_keeps_dates_and_rebuilds_derived_data(self):
+        call_command('add_db_csv')
+        row = read_rows(DEFAULT_DATA_DIR, Review)[0]
+        review = Review.objects.get(pk=row['id'])
+        assert review.pub_date.isoformat().startswith(row['pub_date'][:19]), (
+            'Проверьте, что дата публикации берётся из CSV-файла.'
+        )
+        for title in Title.objects.annotate(avg=Avg('reviews__score')):
+            assert title.rating == title.avg
+            assert title.review_count == title.reviews.count()
+        assert TitleScoreCount.objects.exists()
+        assert LeaderboardEntry.objects.exists()
+        for comment in Comment.objects.select_related('review'):
+            assert comment.review.comment_count == (
+                comment.review.comments.count()
+            )
+        assert CatalogVersion.get_stamp(CatalogVersion.Scopes.TITLES)[0] > 0
+
+    def test_03_repeated_load_conflicts(self):
+        call_command('add_db_csv')
+        with pytest.raises(CommandError):
+            call_command('add_db_csv', force=True)
+        call_command('add_db_csv', force=True, ignore_conflicts=True)
+        assert Title.objects.count() == len(
+            read_rows(DEFAULT_DATA_DIR, Title)
+        )
+
+    def test_04_upsert_updates_rows(self, tmp_path):
+        call_command('add_db_csv')
+        data_dir = tmp_path / 'data'
+        shutil.copytree(DEFAULT_DATA_DIR, data_dir)
+        rows = read_rows(data_dir, Title)
+        rows[0]['name'] = 'Новое название'
+        with open(
+            data_dir / DATA_SOURCES_FOR_MOVIE_DATABASE[Title], 'w',
+            encoding='utf-8', newline=''
+        ) as file:
+            writer = csv.DictWriter(file, fieldnames=rows[0].keys())
+            writer.writeheader()
+            writer.writerows(rows)
+        call_command('add_db_csv', data_dir=data_dir, upsert=True)
+        assert Title.objects.get(pk=rows[0]['id']).name == 'Новое название'
+        assert Title.objects.count() == len(rows)
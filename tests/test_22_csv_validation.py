@@ -0,0 +1,59 @@
+import csv
+import shutil
+
+import pytest
+from django.core.management import call_command
+
+from reviews.management.commands.add_db_csv import (
+    DATA_SOURCES_FOR_MOVIE_DATABASE, DEFAULT_DATA_DIR
+)
+from reviews.models import Review
+
+
+def append_rows(path, rows):
+    ends_with_newline = path.read_bytes().endswith(b'\n')
+    with open(path, 'a', encoding='utf-8', newline='') as file:
+        if not ends_with_newline:
+            file.write('\n')
+        csv.writer(file).writerows(rows)
+
+
+def count_lines(path):
+    with open(path, encoding='utf-8', newline='') as file:
+        return sum(1 for _ in file)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22CsvValidation:
+
+    @pytest.mark.parametrize('workers', (1, 2))
+    def test_01_bad_rows_rejected(self, tmp_path, workers):
+        data_dir = tmp_path / 'data'
+        shutil.copytree(DEFAULT_DATA_DIR, data_dir)
+        review_csv = data_dir / DATA_SOURCES_FOR_MOVIE_DATABASE[Review]
+        first_bad_line = count_lines(review_csv) + 1
+        append_rows(review_csv, (
+            (1001, 1, 'Слишком высоко', 100, 11, '2020-01-01T00:00:00Z'),
+            (1002, 999, 'Нет произведения', 100, 5, '2020-01-01T00:00:00Z'),
+            (1003, 1, 'Нет даты', 100, 5, 'вчера'),
+            (1004, 1, 'Мало столбцов'),
+        ))
+        reject_file = tmp_path / 'rejected.csv'
+        call_command(
+            'add_db_csv', data_dir=data_dir, reject_file=reject_file,
+            workers=workers, batch_size=7
+        )
+        assert not Review.objects.filter(pk__gt=1000).exists(), (
+            'Проверьте, что строки с ошибками не загружаются в базу.'
+        )
+        assert Review.objects.exists()
+        with open(reject_file, encoding='utf-8', newline='') as file:
+            rejected = list(csv.DictReader(file))
+        assert [row['file'] for row in rejected] == ['review.csv'] * 4
+        assert [int(row['line']) for row in rejected] == list(
+            range(first_bad_line, first_bad_line + 4)
+        ), (
+            'Проверьте, что в файле отклонённых строк указаны номера строк '
+            'исходного CSV-файла.'
+        )
+        assert 'title_id=999' in rejected[1]['error']
@@ -0,0 +1,71 @@
+import csv
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from reviews.management.commands import add_db_csv
+from reviews.management.commands.add_db_csv import (
+    DATA_SOURCES_FOR_MOVIE_DATABASE, DEFAULT_DATA_DIR
+)
+from reviews.models import CsvImportCheckpoint, Review, Title
+
+
+def csv_rows_count(model):
+    with open(
+        DEFAULT_DATA_DIR / DATA_SOURCES_FOR_MOVIE_DATABASE[model],
+        encoding='utf-8', newline=''
+    ) as file:
+        return sum(1 for _ in csv.DictReader(file))
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23CsvResume:
+
+    REVIEW_FILE = DATA_SOURCES_FOR_MOVIE_DATABASE[Review]
+
+    def test_01_resume_after_failure(self, monkeypatch):
+        write_batch = add_db_csv.Command.write_batch
+        calls = []
+
+        def failing_write_batch(self, model, columns, objs):
+            if model is Review:
+                calls.append(len(objs))
+                if len(calls) == 3:
+                    raise RuntimeError('Загрузка прервана')
+            return write_batch(self, model, columns, objs)
+
+        monkeypatch.setattr(
+            add_db_csv.Command, 'write_batch', failing_write_batch
+        )
+        with pytest.raises(RuntimeError):
+            call_command('add_db_csv', batch_size=10, workers=1)
+        checkpoint = CsvImportCheckpoint.objects.get(pk=self.REVIEW_FILE)
+        assert not checkpoint.completed
+        assert checkpoint.rows_loaded == Review.objects.count() == 20, (
+            'Проверьте, что контрольная точка фиксируется вместе с каждой '
+            'записанной пачкой.'
+        )
+        assert checkpoint.offset > 0 and checkpoint.line > 20
+
+        monkeypatch.setattr(add_db_csv.Command, 'write_batch', write_batch)
+        call_command('add_db_csv', batch_size=10, workers=1, resume=True)
+        assert Review.objects.count() == csv_rows_count(Review), (
+            'Проверьте, что с `--resume` загрузка продолжается после '
+            'последней записанной пачки.'
+        )
+        checkpoint.refresh_from_db()
+        assert checkpoint.completed
+        assert checkpoint.rows_loaded == csv_rows_count(Review)
+
+    def test_02_unchanged_files_skipped(self):
+        call_command('add_db_csv', workers=1)
+        output = StringIO()
+        call_command('add_db_csv', workers=1, stdout=output)
+        assert output.getvalue().count('пропущен') == len(
+            DATA_SOURCES_FOR_MOVIE_DATABASE
+        ), (
+            'Проверьте, что файлы, не изменившиеся с последней загрузки, '
+            'пропускаются.'
+        )
+        assert Title.objects.count() == csv_rows_count(Title)
@@ -0,0 +1,57 @@
+import json
+
+import pytest
+from django.core.management import call_command
+
+from reviews.management.commands.add_db_csv import (
+    DATA_SOURCES_FOR_MOVIE_DATABASE
+)
+from reviews.models import Category, CsvImportCheckpoint, Genre, Title, User
+
+
+def snapshot():
+    return {
+        model: list(model.objects.order_by('pk').values_list())
+        for model in DATA_SOURCES_FOR_MOVIE_DATABASE
+    }
+
+
+def clear_database():
+    for model in (Title, Category, Genre, User, CsvImportCheckpoint):
+        model.objects.all().delete()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24CsvDump:
+
+    @pytest.mark.parametrize('compress', (False, True))
+    def test_01_round_trip(self, tmp_path, compress):
+        call_command('add_db_csv', workers=1)
+        before = snapshot()
+        call_command('dump_db_csv', tmp_path, gzip=compress, workers=1)
+        suffix = '.gz' if compress else ''
+        for file_name in DATA_SOURCES_FOR_MOVIE_DATABASE.values():
+            assert (tmp_path / f'{file_name}{suffix}').exists(), (
+                f'Проверьте, что `dump_db_csv` создаёт файл {file_name}.'
+            )
+        clear_database()
+        call_command('add_db_csv', data_dir=tmp_path, workers=1)
+        assert snapshot() == before, (
+            'Проверьте, что выгрузка `dump_db_csv` загружается командой '
+            '`add_db_csv` без потерь, включая пересчитанные рейтинги.'
+        )
+
+    def test_02_ndjson(self, tmp_path):
+        call_command('add_db_csv', workers=1)
+        call_command(
+            'dump_db_csv', tmp_path, output_format='ndjson', workers=1,
+            chunk_size=5
+        )
+        with open(tmp_path / 'titles.ndjson', encoding='utf-8') as file:
+            rows = [json.loads(line) for line in file]
+        assert len(rows) == Title.objects.count()
+        title = Title.objects.order_by('pk').first()
+        assert rows[0]['name'] == title.name
+        assert 'rating' not in rows[0], (
+            'Проверьте, что вычисляемые счётчики не выгружаются.'
+        )
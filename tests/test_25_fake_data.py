@@ -0,0 +1,142 @@
+import csv
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db.models import Count, Sum
+
+from reviews.fake_data import FakeDataGenerator, NumpyRandom
+from reviews.management.commands.add_db_csv import (
+    DATA_SOURCES_FOR_MOVIE_DATABASE
+)
+from reviews.models import Comment, Review, Title, User
+
+FAKE_DATA = {
+    'users': 60,
+    'titles': 40,
+    'genres': 5,
+    'categories': 3,
+    'reviews': 400,
+    'comments': 50,
+    'seed': 7,
+    'batch_size': 25,
+}
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25FakeData:
+
+    def test_01_generate_into_database(self):
+        call_command('generate_fake_data', **FAKE_DATA)
+        assert User.objects.count() == FAKE_DATA['users']
+        assert Title.objects.count() == FAKE_DATA['titles']
+        assert Comment.objects.count() == FAKE_DATA['comments']
+        reviews = Review.objects.count()
+        assert 0 < reviews <= FAKE_DATA['reviews']
+        duplicates = Review.objects.values('title', 'author').annotate(
+            count=Count('id')
+        ).filter(count__gt=1)
+        assert not duplicates.exists(), (
+            'Проверьте, что у произведения нет двух отзывов одного автора.'
+        )
+        assert Title.objects.aggregate(
+            total=Sum('review_count')
+        )['total'] == reviews, (
+            'Проверьте, что после генерации пересчитываются счётчики отзывов.'
+        )
+        counts = sorted(
+            Title.objects.values_list('review_count', flat=True),
+            reverse=True
+        )
+        assert counts[0] > 3 * reviews / len(counts), (
+            'Проверьте, что отзывы распределены по закону Ципфа: '
+            'у самых популярных произведений отзывов намного больше среднего.'
+        )
+
+    def test_02_generate_csv_for_import(self, tmp_path):
+        call_command(
+            'generate_fake_data', output_dir=tmp_path / 'fake', **FAKE_DATA
+        )
+        for file_name in DATA_SOURCES_FOR_MOVIE_DATABASE.values():
+            with open(
+                tmp_path / 'fake' / file_name, encoding='utf-8', newline=''
+            ) as file:
+                assert next(csv.reader(file)), (
+                    f'Проверьте, что создаётся файл {file_name} с заголовком.'
+                )
+        reject_file = tmp_path / 'rejected.csv'
+        call_command(
+            'add_db_csv', data_dir=tmp_path / 'fake', workers=1,
+            reject_file=reject_file
+        )
+        assert not reject_file.exists(), (
+            'Проверьте, что сгенерированные CSV-файлы загружаются '
+            '`add_db_csv` без отклонённых строк.'
+        )
+        assert User.objects.count() == FAKE_DATA['users']
+        assert Comment.objects.count() == FAKE_DATA['comments']
+
+    def make_generator(self, use_numpy, **counts):
+        counts = {
+            'users': 20, 'titles': 10, 'genre': 3, 'category': 2,
+            'review': 150, 'comments': 30, **counts
+        }
+        start_ids = dict.fromkeys((
+            'category', 'genre', 'users', 'titles', 'review', 'comments',
+            'genre_title'
+        ), 1)
+        return FakeDataGenerator(
+            counts, start_ids, zipf_exponent=2, seed=3, use_numpy=use_numpy
+        )
+
+    def check_reviews(self, generator):
+        reviews = [row for rows in generator.reviews() for row in rows]
+        pairs = {(title_id, author_id) for _, title_id, _, author_id, *_
+                 in reviews}
+        assert len(pairs) == len(reviews), (
+            'Проверьте, что у произведения нет двух отзывов одного автора.'
+        )
+        return reviews
+
+    @pytest.mark.parametrize('use_numpy', (False, True))
+    def test_03_review_overflow_redistributed(self, use_numpy):
+        if use_numpy:
+            pytest.importorskip('numpy')
+        generator = self.make_generator(use_numpy)
+        assert len(self.check_reviews(generator)) == 150, (
+            'Проверьте, что отзывы сверх числа пользователей переходят '
+            'к другим произведениям, а не теряются.'
+        )
+        generator = self.make_generator(use_numpy, review=1000)
+        assert len(self.check_reviews(generator)) == 200
+
+    def test_04_review_shortfall_warning(self):
+        stdout = StringIO()
+        call_command(
+            'generate_fake_data', stdout=stdout,
+            **{**FAKE_DATA, 'users': 3, 'titles': 4, 'comments': 0}
+        )
+        assert Review.objects.count() == 12
+        assert 'Создано отзывов: 12 вместо 400' in stdout.getvalue(), (
+            'Проверьте, что команда предупреждает, если отзывов больше, '
+            'чем пар произведение - пользователь.'
+        )
+
+    def test_05_numpy_generation(self, tmp_path):
+        pytest.importorskip('numpy')
+        generator = self.make_generator(True)
+        assert isinstance(generator.random, NumpyRandom)
+        self.check_reviews(generator)
+        call_command(
+            'generate_fake_data', output_dir=tmp_path / 'fake', **FAKE_DATA
+        )
+        reject_file = tmp_path / 'rejected.csv'
+        call_command(
+            'add_db_csv', data_dir=tmp_path / 'fake', workers=1,
+            reject_file=reject_file
+        )
+        assert not reject_file.exists(), (
+            'Проверьте, что CSV-файлы, созданные с NumPy, загружаются '
+            '`add_db_csv` без отклонённых строк.'
+        )
+        assert Review.objects.count() == FAKE_DATA['reviews']
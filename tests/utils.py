@@ -1,5 +1,7 @@
 from http import HTTPStatus
 
+from reviews.models import Category, Genre, Title
+
 
 check_name_and_slug_patterns = (
     (
@@ -305,3 +307,19 @@ def check_fields(obj_type, url_pattern, obj, expected_data, detail=False):
         f'данные {obj_types[obj_type]}{results_in_msg}. Поле `id` не '
         'найдено или не является целым числом.'
     )
+
+
+def create_titles_bulk(count, start=0):
+    category, _ = Category.objects.get_or_create(name='Фильм', slug='films')
+    genres = [
+        Genre.objects.get_or_create(name=slug, slug=slug)[0]
+        for slug in ('horror', 'comedy')
+    ]
+    titles = []
+    for idx in range(start, start + count):
+        title = Title.objects.create(
+            name=f'Произведение {idx:03}', year=2000, category=category
+        )
+        title.genre.set(genres)
+        titles.append(title)
+    return titles